@@ -1,10 +1,47 @@
+import os
+
 import streamlit as st
 import pandas as pd
-import plotly.express as px
+
+from debtleb.charts import (
+    LARGE_SERIES_POINTS, build_composition_figure, build_period_figure, build_public_share_figure,
+    figure_payload_bytes, is_large_series,
+)
+from debtleb.composition import build_composition_table
+from debtleb.cube import build_cube
+from debtleb.derived import DerivedCache
+from debtleb.figcache import FigureCache
+from debtleb.indicators import (
+    COMPOSITION_YEARS, CUSTOM_PERIOD, DEBT_COMPOSITION_INDICATORS, INDICATOR_NAMES, KEY_DEBT_INDICATORS, PERIODS,
+    PRIVATE_DEBT_CATEGORIES, PUBLIC_DEBT_CATEGORIES,
+)
+from debtleb.insights import build_insights
+from debtleb.instrument import RenderTimings, enable_log
+from debtleb.rangestats import build_range_index, range_stats
+from debtleb.rawview import PAGE_SIZES, csv_bytes, matching_rows, page_count, page_frame
+from debtleb.snapshots import DEFAULT_POLL_SECONDS, SnapshotWatcher
+from debtleb.store import DEFAULT_MEMORY_BUDGET_MB, PartitionStore, ensure_store
 
 # -------------------- PAGE CONFIG --------------------
 st.set_page_config(layout="wide", page_title="External Debt Interactive Dashboard", page_icon="💰")
 
+# -------------------- INSTRUMENTATION --------------------
+# Every rerun times its named sections. DEBTLEB_PERF_LOG=1 logs one JSON
+# line per page or fragment run on the "debtleb.perf" logger; DEBTLEB_DEBUG=1
+# (or opening the page with ?debug=1) shows the timings in the sidebar.
+PERF_LOG = os.environ.get('DEBTLEB_PERF_LOG') == '1'
+if PERF_LOG:
+    enable_log()
+DEBUG_PANEL = os.environ.get('DEBTLEB_DEBUG') == '1' or st.query_params.get('debug') == '1'
+# Measuring a figure's payload serializes it a second time, so it is only
+# done when something reads the sizes.
+MEASURE_PAYLOADS = PERF_LOG or DEBUG_PANEL
+
+def finish_timings(timings):
+    st.session_state.setdefault('render_timings', {})[timings.unit] = timings.finish()
+
+page_timings = RenderTimings("page")
+
 # -------------------- CUSTOM CSS --------------------
 st.markdown("""
 <style>
@@ -40,97 +77,126 @@ st.markdown("""
 </style>
 """, unsafe_allow_html=True)
 
-# -------------------- INDICATOR NAME MAPPING --------------------
-indicator_names = {
-    # External Sector
-    "BM.GSR.TOTL.CD": "Balance of payments, current account, goods, services and primary income (BoP, US$)",
-    "BN.CAB.XOKA.CD": "Current account balance (BoP, US$)",
-    "BX.GSR.TOTL.CD": "Exports of goods and services (BoP, US$)",
-    "BX.TRF.PWKR.CD.DT": "Personal remittances, received (US$)",
-    # FDI & Portfolio
-    "BX.KLT.DINV.CD.WD": "Foreign direct investment, net inflows (US$)",
-    "BX.PEF.TOTL.CD.WD": "Portfolio equity, net inflows (US$)",
-    # Debt Indicators
-    "DT.DOD.DECT.CD": "External debt stocks, total (US$)",
-    "DT.DOD.DECT.GN.ZS": "External debt stocks (% of GNI)",
-    "DT.DOD.DIMF.CD": "Use of IMF credit (US$)",
-    "DT.DOD.DLXF.CD": "Long-term external debt (US$)",
-    "DT.DOD.DPNG.CD": "Multilateral debt (US$)",
-    "DT.DOD.DPPG.CD": "Public and publicly guaranteed debt (US$)",
-    "DT.DOD.DSTC.CD": "Short-term debt (US$)",
-    "DT.DOD.DSTC.ZS": "Short-term debt (% of total external debt)",
-    "DT.DOD.DSTC.XP.ZS": "Short-term debt (% of exports)",
-    "DT.DOD.DSTC.IR.ZS": "Short-term debt (% of international reserves)",
-    "DT.DOD.MIBR.CD": "IBRD loans and IDA credits (US$)",
-    "DT.DOD.MIDA.CD": "IDA total (US$)",
-    "DT.DOD.MWBG.CD": "World Bank debt outstanding (US$)",
-    "DT.DOD.PVLX.CD": "Present value of external debt (US$)",
-    "DT.DOD.PVLX.EX.ZS": "Present value of external debt (% of exports of goods and services)",
-    # Debt Service
-    "DT.TDS.DIMF.CD": "Debt service paid to IMF (US$)",
-    "DT.TDS.DPPF.XP.ZS": "Public and publicly guaranteed debt service (% of exports)",
-    "DT.TDS.DPPG.CD": "Public and publicly guaranteed debt service (US$)",
-    "DT.TDS.DPPG.GN.ZS": "Public and publicly guaranteed debt service (% of GNI)",
-    "DT.TDS.DPPG.XP.ZS": "Public and publicly guaranteed debt service (% of exports)",
-    "DT.TDS.MLAT.CD": "Multilateral debt service (US$)",
-    "DT.TDS.MLAT.PG.ZS": "Multilateral debt service (% of government revenue)",
-    "DT.TDS.DECT.CD": "Total debt service, external (US$)",
-    "DT.TDS.DECT.EX.ZS": "Total debt service (% of exports of goods and services)",
-    "DT.TDS.DECT.GN.ZS": "Total debt service (% of GNI)",
-    # Debt Liabilities
-    "DT.NFL.BLAT.CD": "Debt liabilities, total (US$)",
-    "DT.NFL.BOND.CD": "Bond debt, total (US$)",
-    "DT.NFL.DPNG.CD": "Multilateral debt liabilities (US$)",
-    "DT.NFL.IMFN.CD": "IMF debt liabilities (US$)",
-    "DT.NFL.MIBR.CD": "IBRD loans (US$)",
-    "DT.NFL.MIDA.CD": "IDA credits (US$)",
-    "DT.NFL.MLAT.CD": "Multilateral debt liabilities (US$)",
-    "DT.NFL.MOTH.CD": "Other debt liabilities (US$)",
-    "DT.NFL.NIFC.CD": "Not included in foreign currency debt (US$)",
-    "DT.NFL.OFFT.CD": "Official creditors (US$)",
-    "DT.NFL.PBND.CD": "Public bonds (US$)",
-    "DT.NFL.PCBK.CD": "Public commercial bank debt (US$)",
-    "DT.NFL.PCBO.CD": "Other public bank debt (US$)",
-    "DT.NFL.PROP.CD": "Private sector debt, other (US$)",
-    "DT.NFL.PRVT.CD": "Private debt (US$)",
-    "DT.NFL.PNGB.CD": "Private non-guaranteed bonds (US$)",
-    "DT.NFL.PNGC.CD": "Private non-guaranteed commercial debt (US$)",
-    # Grants / ODA
-    "BX.GRT.EXTA.CD.WD": "Grants (excluding technical cooperation, US$)",
-    "BX.GRT.TECH.CD.WD": "Grants (technical cooperation, US$)",
-    "DT.ODA.ODAT.CD": "Official Development Assistance, total (US$)",
-    "DT.ODA.ODAT.GN.ZS": "Official Development Assistance (% of GNI)",
-    "DT.ODA.ODAT.PC.ZS": "Official Development Assistance per capita (US$)",
-    # Financial / Reserves
-    "FI.RES.TOTL.DT.ZS": "Total reserves (% of total external debt)",
-    "FI.RES.TOTL.MO": "Total reserves in months of imports",
-    "FI.RES.TOTL.CD": "Total reserves (US$)",
-    # GNP
-    "NY.GNP.MKTP.CD": "Gross National Product (current US$)"
-}
-
 # -------------------- LOAD DATA --------------------
-@st.cache_data
-def load_data(file_path):
+DATA_FILE = 'ec4c40221073bbdf6f75b6c6127249c3_20240905_173222.csv'
+STORE_DIR = os.environ.get('DEBTLEB_STORE_DIR', 'store')
+MEMORY_BUDGET_MB = float(os.environ.get('DEBTLEB_MEMORY_BUDGET_MB', DEFAULT_MEMORY_BUDGET_MB))
+# "arrow" writes uncompressed Arrow IPC partitions that every server process
+# on the host memory-maps read-only instead of parsing its own copy.
+STORE_FORMAT = os.environ.get('DEBTLEB_STORE_FORMAT', 'parquet')
+# When set, the newest export in this directory is served instead of
+# DATA_FILE, and new exports dropped there are ingested in the background.
+SNAPSHOT_DIR = os.environ.get('DEBTLEB_SNAPSHOT_DIR')
+SNAPSHOT_POLL_SECONDS = float(os.environ.get('DEBTLEB_SNAPSHOT_POLL_SECONDS', DEFAULT_POLL_SECONDS))
+DEFAULT_COUNTRY = 'Lebanon'
+# Line charts with more points than this switch to downsampled WebGL traces.
+MAX_CHART_POINTS = int(os.environ.get('DEBTLEB_LARGE_SERIES_POINTS', LARGE_SERIES_POINTS))
+
+# One partition per country, loaded on first request and evicted LRU once
+# the loaded partitions exceed MEMORY_BUDGET_MB.
+@st.cache_resource
+def get_watcher():
+    if not SNAPSHOT_DIR:
+        return None
+    watcher = SnapshotWatcher(SNAPSHOT_DIR, STORE_DIR, STORE_FORMAT, SNAPSHOT_POLL_SECONDS)
+    if watcher.poll() is None:
+        raise FileNotFoundError(f"No exports found in {SNAPSHOT_DIR}")
+    return watcher.start()
+
+@st.cache_resource
+def get_store():
+    if get_watcher() is None:
+        ensure_store([DATA_FILE], STORE_DIR, STORE_FORMAT)
+    return PartitionStore(STORE_DIR, INDICATOR_NAMES, MEMORY_BUDGET_MB)
+
+def load_data(country):
     try:
-        df = pd.read_csv(file_path)
-        df['Indicator Name'] = df['Indicator Code'].map(indicator_names).fillna(df['Indicator Code'])
-        df['Value_Billions'] = df['Value'] / 1e9
-        return df
+        return get_store().get(country)
     except Exception as e:
         st.error(f"Error loading data: {str(e)}")
         return pd.DataFrame()
 
-df = load_data('ec4c40221073bbdf6f75b6c6127249c3_20240905_173222.csv')
+# Derived structures are keyed by the partition's content version, so only
+# countries whose data changed in a new snapshot are rebuilt.
+@st.cache_resource(max_entries=32)
+def load_cube(country, version, _timings=None):
+    if _timings is not None:
+        _timings.cache("cube", hit=False)
+    return build_cube(load_data(country))
+
+@st.cache_resource(max_entries=32)
+def load_range_index(country, version, _timings=None):
+    if _timings is not None:
+        _timings.cache("range_index", hit=False)
+    return build_range_index(load_cube(country, version))
+
+# Composition, public/private split and largest component for every year,
+# so the year selector is a row lookup.
+@st.cache_resource(max_entries=32)
+def load_composition_table(country, version, _timings=None):
+    if _timings is not None:
+        _timings.cache("composition_table", hit=False)
+    return build_composition_table(
+        load_cube(country, version),
+        DEBT_COMPOSITION_INDICATORS, PUBLIC_DEBT_CATEGORIES, PRIVATE_DEBT_CATEGORIES
+    )
+
+# Insight payloads of every predefined period and composition year; custom
+# ranges are added on demand, up to a bound.
+@st.cache_resource(max_entries=32)
+def load_insights(country, version, _timings=None):
+    if _timings is not None:
+        _timings.cache("insights", hit=False)
+    return build_insights(
+        load_cube(country, version), load_composition_table(country, version), country, maxsize=64
+    )
+
+# Ratios derived from the base series; a new data version only re-evaluates
+# the changed years of the ratios that read a changed indicator.
+@st.cache_resource(max_entries=32)
+def get_derived_cache(country):
+    return DerivedCache()
+
+try:
+    store = get_store()
+    store.refresh_if_changed()
+    countries = store.countries()
+except Exception as e:
+    st.error(f"Error loading data: {str(e)}")
+    countries = []
+
+country = st.sidebar.selectbox(
+    "Country",
+    options=countries,
+    index=countries.index(DEFAULT_COUNTRY) if DEFAULT_COUNTRY in countries else 0,
+    help="Reporting country from the International Debt Statistics export"
+) if countries else None
+page_timings.context["country"] = country
+with page_timings.section("load_data"):
+    df = load_data(country) if country else pd.DataFrame()
 
 if df.empty:
     st.error("⚠️ Could not load the data file. Please ensure the CSV file is in the correct location.")
     st.stop()
 
+version = store.version(country)
+with page_timings.section("cube"):
+    page_timings.cache("cube", hit=True)
+    page_timings.cache("range_index", hit=True)
+    page_timings.cache("composition_table", hit=True)
+    page_timings.cache("insights", hit=True)
+    cube = load_cube(country, version, page_timings)
+    range_index = load_range_index(country, version, page_timings)
+    composition_table = load_composition_table(country, version, page_timings)
+    insights = load_insights(country, version, page_timings)
+with page_timings.section("derived"):
+    derived = get_derived_cache(country).get(cube, version, store.changes(country))
+
 # -------------------- DASHBOARD HEADER --------------------
 st.markdown('<h1 class="main-header">💰 External Debt Interactive Dashboard</h1>', unsafe_allow_html=True)
 
-st.markdown("""
+if country == "Lebanon":
+    st.markdown("""
 <div class="insight-box">
 <h3>📊 Lebanon's External Debt Analysis Dashboard</h3>
 <p>This interactive dashboard analyzes Lebanon's external debt patterns from 1970-2023, providing insights into the country's debt crisis. 
@@ -138,286 +204,313 @@ The visualizations demonstrate that Lebanon's debt problems are primarily driven
 Use the interactive features below to explore Lebanon's debt evolution across different economic periods and years.</p>
 </div>
 """, unsafe_allow_html=True)
+else:
+    st.markdown(f"""
+<div class="insight-box">
+<h3>📊 {country}'s External Debt Analysis Dashboard</h3>
+<p>This interactive dashboard analyzes {country}'s external debt patterns from {cube.years[0]}-{cube.years[-1]}.
+Use the interactive features below to explore {country}'s debt evolution across different economic periods and years.</p>
+</div>
+""", unsafe_allow_html=True)
 
-# -------------------- LEBANON'S DEBT PATTERN DURING SELECTED PERIOD --------------------
-st.markdown("### 📈 **Lebanon's Debt Pattern During Selected Period**")
-st.markdown("*Focus on specific time periods to analyze debt patterns during different economic phases*")
-
-# Get available years for range selection
-min_year = int(df['refPeriod'].min())
-max_year = int(df['refPeriod'].max())
-
-# Create predefined periods with economic context
-periods = {
-    "🏛️ Post-2019 Crisis (2019-2023)": (2019, 2023),
-    "💰 Pre-Crisis Stability (2010-2018)": (2010, 2018), 
-    "🌍 Global Financial Crisis Impact (2007-2012)": (2007, 2012),
-    "📈 Economic Growth Era (2000-2008)": (2000, 2008),
-    "🏗️ Post-War Reconstruction (1990-2000)": (1990, 2000),
-    "🔍 Custom Period": "custom"
-}
-
-selected_period = st.radio(
-    "Choose Time Period to Analyze:",
-    options=list(periods.keys()),
-    index=0,
-    help="Select a predefined economic period or choose custom to set your own range"
-)
+# -------------------- FIGURES --------------------
+# Built figures are shared by every session; repeat views skip Plotly
+# Express entirely. Sessions that measure payloads get their own cache.
+@st.cache_resource(max_entries=32)
+def get_figure_cache(country, measure_payloads):
+    return FigureCache(maxsize=128, size_of=figure_payload_bytes if measure_payloads else None)
+
+def figure_touched(key, changes):
+    kind, selection, indicators = key
+    if kind in ("period", "period_full", "public_share"):
+        years_hit = any(selection[0] <= year <= selection[1] for year in changes["years"])
+    else:
+        years_hit = selection in changes["years"]
+    changed_names = {INDICATOR_NAMES.get(code, code) for code in changes["indicators"]}
+    return years_hit and not changed_names.isdisjoint(indicators)
 
-if selected_period == "🔍 Custom Period":
-    col1, col2 = st.columns(2)
-    with col1:
-        start_year = st.number_input("Start Year", min_value=min_year, max_value=max_year, value=2010)
-    with col2:
-        end_year = st.number_input("End Year", min_value=min_year, max_value=max_year, value=max_year)
-    year_range = (start_year, end_year)
-else:
-    year_range = periods[selected_period]
-
-# -------------------- VISUALIZATION 1: DEBT EVOLUTION IN SELECTED LEBANON PERIOD --------------------
-
-key_debt_indicators = ["External debt stocks, total (US$)", "Long-term external debt (US$)", "Short-term debt (US$)"]
-period_data = df[
-    (df['refPeriod'] >= year_range[0]) & 
-    (df['refPeriod'] <= year_range[1]) &
-    (df['Indicator Name'].isin(key_debt_indicators))
-]
-
-if not period_data.empty:
-    fig1 = px.line(
-        period_data, 
-        x='refPeriod', 
-        y='Value_Billions', 
-        color='Indicator Name',
-        title=f"Lebanon's Debt During: {year_range[0]} - {year_range[1]} (Billions USD)",
-        markers=True,
-        line_shape='spline'
-    )
-    fig1.update_layout(
-        xaxis_title="Year",
-        yaxis_title="Value (Billions USD)",
-        hovermode='x unified',
-        height=500,
-        legend=dict(yanchor="top", y=0.99, xanchor="left", x=0.01)
+# A new data version only drops the figures whose years and indicators it
+# touched.
+figure_cache = get_figure_cache(country, MEASURE_PAYLOADS)
+figure_cache.advance(version, store.changes(country), figure_touched)
+
+# -------------------- LEBANON'S DEBT PATTERN DURING SELECTED PERIOD --------------------
+@st.fragment
+def period_section():
+    timings = RenderTimings("period_section", country=country)
+    st.markdown(f"### 📈 **{country}'s Debt Pattern During Selected Period**")
+    st.markdown("*Focus on specific time periods to analyze debt patterns during different economic phases*")
+
+    # Get available years for range selection
+    min_year = int(cube.years[0])
+    max_year = int(cube.years[-1])
+
+    # Create predefined periods with economic context
+    periods = {**PERIODS, CUSTOM_PERIOD: "custom"}
+
+    selected_period = st.radio(
+        "Choose Time Period to Analyze:",
+        options=list(periods.keys()),
+        index=0,
+        help="Select a predefined economic period or choose custom to set your own range"
     )
-    fig1.update_traces(line=dict(width=3), marker=dict(size=8))
-    st.plotly_chart(fig1, use_container_width=True)
-    
-    col1, col2, col3 = st.columns(3)
-    
-    with col1:
-        st.markdown("#### 📊 Period Statistics")
-        for indicator in key_debt_indicators:
-            indicator_data = period_data[period_data['Indicator Name'] == indicator]
-            if not indicator_data.empty:
-                avg_value = indicator_data['Value_Billions'].mean()
-                volatility = indicator_data['Value_Billions'].std()
-                st.write(f"**{indicator.replace(' External', '')}**")
-                st.write(f"Average: ${avg_value:.1f}B")
-                st.write(f"Volatility: {volatility:.1f}")
-                st.write("---")
-    
-    with col2:
-        st.markdown("#### 📈 Growth Rates")
-        for indicator in key_debt_indicators:
-            indicator_data = period_data[period_data['Indicator Name'] == indicator].sort_values('refPeriod')
-            if len(indicator_data) >= 2:
-                start_val = indicator_data['Value_Billions'].iloc[0]
-                end_val = indicator_data['Value_Billions'].iloc[-1]
-                total_growth = ((end_val - start_val) / start_val * 100) if start_val != 0 else 0
-                years = year_range[1] - year_range[0]
-                annual_growth = ((end_val / start_val) ** (1/years) - 1) * 100 if start_val > 0 and years > 0 else 0
-                direction = "📈" if total_growth > 0 else "📉" if total_growth < 0 else "➡️"
-                st.write(f"**{indicator.replace(' External', '')}**")
-                st.write(f"{direction} Total: {total_growth:+.1f}%")
-                st.write(f"Annual: {annual_growth:+.1f}%")
-                st.write("---")
-    
-    with col3:
-        st.markdown("#### 🇱🇧 Lebanon Context")
-        period_name = selected_period.split(' ', 1)[1] if selected_period != "🔍 Custom Period" else f"Custom ({year_range[0]}-{year_range[1]})"
-        if "Post-2019 Crisis" in selected_period:
-            st.write("💥 **Lebanon Context**: Banking crisis, currency collapse, economic meltdown, political instability")
-        elif "Pre-Crisis Stability" in selected_period:
-            st.write("💰 **Lebanon Context**: Relative stability, high public debt, banking sector confidence before 2019 crisis")
-        elif "Global Financial Crisis" in selected_period:
-            st.write("🌍 **Lebanon Context**: Resilience during global crisis, continued borrowing, pre-crisis confidence")
-        elif "Economic Growth Era" in selected_period:
-            st.write("📈 **Lebanon Context**: Post-war reconstruction completion, economic growth, increased foreign investment")
-        elif "Post-War Reconstruction" in selected_period:
-            st.write("🏗️ **Lebanon Context**: Massive reconstruction spending, Solidere project, rapid debt accumulation")
+
+    if selected_period == CUSTOM_PERIOD and min_year == max_year:
+        st.caption(f"{country} only reports {min_year}.")
+        year_range = (min_year, max_year)
+    elif selected_period == CUSTOM_PERIOD:
+        col1, col2 = st.columns(2)
+        with col1:
+            # Start at 2010 when the country's data covers it.
+            start_year = st.number_input(
+                "Start Year", min_value=min_year, max_value=max_year, value=min(max(2010, min_year), max_year)
+            )
+        with col2:
+            end_year = st.number_input("End Year", min_value=min_year, max_value=max_year, value=max_year)
+        year_range = (start_year, end_year)
+    else:
+        year_range = periods[selected_period]
+
+    # -------------------- VISUALIZATION 1: DEBT EVOLUTION IN SELECTED LEBANON PERIOD --------------------
+
+    key_debt_indicators = KEY_DEBT_INDICATORS
+    with timings.section("period_filter"):
+        period_rows = cube.rows_between(year_range[0], year_range[1])
+        period_cols = cube.columns_for(key_debt_indicators)
+        period_data = cube.long_frame(period_rows, period_cols)
+    with timings.section("period_stats"):
+        period_stats = range_stats(range_index, year_range[0], year_range[1], period_cols)
+        period_insight = insights.period(selected_period, year_range)
+
+    if not period_data.empty:
+        # Long ranges are downsampled; the toggle or a narrower period shows
+        # every observation.
+        large_series = is_large_series(period_data, MAX_CHART_POINTS)
+        full_resolution = large_series and st.toggle(
+            "Full resolution",
+            help="Draw every observation instead of a downsampled WebGL chart"
+        )
+        fig1_key = ("period_full" if full_resolution else "period", tuple(year_range), tuple(key_debt_indicators))
+        with timings.section("period_figure"):
+            fig1 = figure_cache.get_or_build(
+                fig1_key,
+                timings.cached(
+                    "period_figure",
+                    lambda: build_period_figure(
+                        period_data, year_range, country, MAX_CHART_POINTS, downsample=not full_resolution
+                    ),
+                ),
+                version,
+            )
+        timings.payload("period_figure", figure_cache.payload_bytes(fig1_key))
+        with timings.section("period_chart"):
+            st.plotly_chart(fig1, use_container_width=True)
+        if large_series and not full_resolution:
+            st.caption(
+                f"Showing a downsampled WebGL chart of {len(period_data):,} observations; "
+                "narrow the period or switch on full resolution to see every point."
+            )
+
+        with timings.section("statistics_columns"):
+            col1, col2, col3 = st.columns(3)
+
+            with col1:
+                st.markdown("#### 📊 Period Statistics")
+                for stat in period_stats.itertuples():
+                    if stat.observations:
+                        st.write(f"**{stat.indicator.replace(' External', '')}**")
+                        st.write(f"Average: ${stat.average:.1f}B")
+                        st.write(f"Volatility: {stat.volatility:.1f}")
+                        st.write("---")
+
+            with col2:
+                st.markdown("#### 📈 Growth Rates")
+                for stat in period_stats.itertuples():
+                    if stat.observations >= 2:
+                        direction = "📈" if stat.total_growth > 0 else "📉" if stat.total_growth < 0 else "➡️"
+                        st.write(f"**{stat.indicator.replace(' External', '')}**")
+                        st.write(f"{direction} Total: {stat.total_growth:+.1f}%")
+                        st.write(f"Annual: {stat.annual_growth:+.1f}%")
+                        st.write("---")
+
+            with col3:
+                st.markdown("#### 🇱🇧 Lebanon Context" if country == "Lebanon" else f"#### 🌐 {country} Context")
+                if period_insight["context"]:
+                    icon, context = period_insight["context"]
+                    st.write(f"{icon} **Lebanon Context**: {context}")
+                else:
+                    st.write(f"📊 **Analysis Period**: {period_insight['start_year']} to {period_insight['end_year']}")
+
+                st.write(f"📅 **Duration**: {period_insight['duration']} years")
+                st.write(f"📈 **Data Points**: {period_insight['years_with_data']} years")
+
+        period_name = period_insight["name"]
+        if country == "Lebanon":
+            st.markdown(f"""
+        **📊 Analysis of Lebanon's Debt During {period_name}:**
+        This period analysis reveals specific patterns in Lebanon's debt accumulation during {period_name.lower()}. The chart shows how external debt evolved during this crucial phase of Lebanon's economic history, with long-term debt consistently representing the largest component of external obligations. The growth rates and volatility statistics provide insights into the pace of debt accumulation and economic stability during this period. Lebanon's debt trajectory during this time reflects the underlying economic policies, external shocks, and political decisions that shaped the country's fiscal position. Understanding these period-specific patterns is crucial for comprehending how Lebanon reached its current debt crisis and identifying the structural factors that need to be addressed in any sustainable solution.
+        """)
+
+    else:
+        st.warning("No data available for the selected time period.")
+
+    with timings.section("period_insights"):
+        st.markdown("#### 💡 Key Insights for Selected Period")
+        if not period_data.empty and period_insight["peak_year"] is not None:
+            st.markdown(f"""
+            <div class="insight-box">
+            <strong>🔝 Peak Debt:</strong> ${period_insight['peak_billions']:.1f}B in {period_insight['peak_year']}<br>
+            <strong>🔽 Lowest Debt:</strong> ${period_insight['lowest_billions']:.1f}B in {period_insight['lowest_year']}<br>
+            <strong>📊 Range:</strong> ${period_insight['range_billions']:.1f}B difference
+            </div>
+            """, unsafe_allow_html=True)
+
+    with timings.section("debt_ratios"):
+        st.markdown("#### 📐 Debt Ratios for Selected Period")
+        ratio_rows = derived.rows_between(year_range[0], year_range[1])
+        ratios = pd.DataFrame(
+            derived.values[ratio_rows],
+            index=pd.Index(derived.years[ratio_rows], name="Year"),
+            columns=derived.names
+        ).dropna(how="all")
+        if ratios.empty:
+            st.markdown(f"No ratio data available for {year_range[0]}-{year_range[1]}")
         else:
-            st.write(f"📊 **Analysis Period**: {year_range[0]} to {year_range[1]}")
-            
-        duration = year_range[1] - year_range[0] + 1
-        st.write(f"📅 **Duration**: {duration} years")
-        data_points = len(period_data['refPeriod'].unique())
-        st.write(f"📈 **Data Points**: {data_points} years")
-
-    period_name = selected_period.replace("🏛️ ", "").replace("💰 ", "").replace("🌍 ", "").replace("📈 ", "").replace("🏗️ ", "").replace("🔍 ", "")
-    st.markdown(f"""
-    **📊 Analysis of Lebanon's Debt During {period_name}:**
-    This period analysis reveals specific patterns in Lebanon's debt accumulation during {period_name.lower()}. The chart shows how external debt evolved during this crucial phase of Lebanon's economic history, with long-term debt consistently representing the largest component of external obligations. The growth rates and volatility statistics provide insights into the pace of debt accumulation and economic stability during this period. Lebanon's debt trajectory during this time reflects the underlying economic policies, external shocks, and political decisions that shaped the country's fiscal position. Understanding these period-specific patterns is crucial for comprehending how Lebanon reached its current debt crisis and identifying the structural factors that need to be addressed in any sustainable solution.
-    """)
+            st.dataframe(ratios.round(1))
+            st.caption("Published World Bank ratios; years without one are computed from the underlying US$ series.")
 
-else:
-    st.warning("No data available for the selected time period.")
-
-st.markdown("#### 💡 Key Insights for Selected Period")
-if not period_data.empty:
-    total_debt_data = period_data[period_data['Indicator Name'] == 'External debt stocks, total (US$)']
-    if not total_debt_data.empty:
-        max_debt_year = total_debt_data.loc[total_debt_data['Value_Billions'].idxmax(), 'refPeriod']
-        max_debt_value = total_debt_data['Value_Billions'].max()
-        min_debt_year = total_debt_data.loc[total_debt_data['Value_Billions'].idxmin(), 'refPeriod']
-        min_debt_value = total_debt_data['Value_Billions'].min()
-        
-        st.markdown(f"""
-        <div class="insight-box">
-        <strong>🔝 Peak Debt:</strong> ${max_debt_value:.1f}B in {max_debt_year}<br>
-        <strong>🔽 Lowest Debt:</strong> ${min_debt_value:.1f}B in {min_debt_year}<br>
-        <strong>📊 Range:</strong> ${max_debt_value - min_debt_value:.1f}B difference
-        </div>
-        """, unsafe_allow_html=True)
+    finish_timings(timings)
+
+period_section()
 
 # -------------------- YEAR SELECTOR FOR SECOND VISUALIZATION --------------------
-st.markdown("---")
-st.markdown("### 📊 **Lebanon's External Debt Evolution Over Time**")
-st.markdown("*Select a specific year to analyze Lebanon's debt composition*")
+@st.fragment
+def composition_section():
+    timings = RenderTimings("composition_section", country=country)
+    st.markdown("---")
+    st.markdown(f"### 📊 **{country}'s External Debt Evolution Over Time**")
+    st.markdown(f"*Select a specific year to analyze {country}'s debt composition*")
+
+    # Filter available years to 1960-2022
+    available_years = [int(year) for year in cube.years if COMPOSITION_YEARS[0] <= year <= COMPOSITION_YEARS[1]]
+    if not available_years:
+        st.warning(f"No {country} data between {COMPOSITION_YEARS[0]} and {COMPOSITION_YEARS[1]} to analyze.")
+        finish_timings(timings)
+        return
+
+    selected_year_for_analysis = st.selectbox(
+        "Choose Year for Analysis:",
+        options=available_years,
+        index=len(available_years)-5 if len(available_years) >= 5 else len(available_years)-1,
+        help=f"Select a year between 1960-2022 to see {country}'s debt composition"
+    )
 
-# Filter available years to 1960-2022
-available_years = [int(year) for year in sorted(df['refPeriod'].unique()) if 1960 <= year <= 2022]
+    # Zero and null components are filtered out
+    with timings.section("composition_split"):
+        split = composition_table.split(selected_year_for_analysis)
+        composition_insight = insights.composition(selected_year_for_analysis)
+        composition_cols = split["cols"]
+        if composition_cols:
+            composition_data_for_analysis = cube.long_frame(slice(split["row"], split["row"] + 1), composition_cols)
+        else:
+            composition_data_for_analysis = pd.DataFrame()
 
-selected_year_for_analysis = st.selectbox(
-    "Choose Year for Analysis:",
-    options=available_years,
-    index=len(available_years)-5 if len(available_years) >= 5 else len(available_years)-1,
-    help="Select a year between 1960-2022 to see Lebanon's debt composition"
-)
+    # -------------------- VISUALIZATION 2: DEBT COMPOSITION PIE CHART --------------------
+    col1, col2 = st.columns([2, 1])
 
-# Filter data for selected year
-year_data_for_analysis = df[df['refPeriod'] == selected_year_for_analysis]
-
-# Define key debt indicators for composition
-debt_composition_indicators = [
-    "External debt stocks, total (US$)",
-    "Multilateral debt (US$)",
-    "Public and publicly guaranteed debt (US$)",
-    "World Bank debt outstanding (US$)",
-    "Public commercial bank debt (US$)",
-    "Other public bank debt (US$)",
-    "Private sector debt, other (US$)",
-    "Private debt (US$)",
-    "Private non-guaranteed commercial debt (US$)"
-]
-
-composition_data_for_analysis = year_data_for_analysis[year_data_for_analysis['Indicator Name'].isin(debt_composition_indicators)]
-
-# Filter out zero or null values
-composition_data_for_analysis = composition_data_for_analysis[
-    (composition_data_for_analysis['Value_Billions'] > 0) & 
-    (composition_data_for_analysis['Value_Billions'].notna())
-]
-
-# -------------------- VISUALIZATION 2: DEBT COMPOSITION PIE CHART --------------------
-col1, col2 = st.columns([2, 1])
-
-with col1:
-    if not composition_data_for_analysis.empty:
-        fig2 = px.pie(
-            composition_data_for_analysis,
-            values="Value_Billions",
-            names="Indicator Name",
-            title=f"Debt Composition in {selected_year_for_analysis} (Billions USD)",
-            color_discrete_sequence=px.colors.qualitative.Set3,
-            hole=0.4
+    with col1:
+        if not composition_data_for_analysis.empty:
+            fig2_key = ("composition", selected_year_for_analysis, tuple(cube.names[col] for col in composition_cols))
+            with timings.section("composition_figure"):
+                fig2 = figure_cache.get_or_build(
+                    fig2_key,
+                    timings.cached(
+                        "composition_figure",
+                        lambda: build_composition_figure(composition_data_for_analysis, selected_year_for_analysis),
+                    ),
+                    version,
+                )
+            timings.payload("composition_figure", figure_cache.payload_bytes(fig2_key))
+
+            with timings.section("composition_chart"):
+                st.plotly_chart(fig2, use_container_width=True)
+
+            if country == "Lebanon":
+                st.markdown(f"""
+            **📊 Analysis of Lebanon's Debt Composition ({selected_year_for_analysis}):**
+            This pie chart clearly demonstrates that Lebanon's external debt crisis is primarily a **public sector responsibility**, not a private sector or banking sector issue. The visualization shows that Public and Publicly Guaranteed Debt, along with Multilateral Debt (including World Bank debt), constitute the overwhelming majority of Lebanon's external obligations. Private debt and private non-guaranteed commercial debt represent only a small fraction of total external debt. This pattern indicates that Lebanon's debt problems stem from government fiscal policies, public spending decisions, and sovereign borrowing rather than private sector over-borrowing or banking sector excesses. The dominance of public debt highlights the need for fiscal reform and public sector restructuring as key solutions to Lebanon's debt crisis.
+            """)
+
+        else:
+            st.warning(f"No debt composition data available for {selected_year_for_analysis}. Try selecting a different year.")
+
+    with timings.section("composition_insights"):
+        with col2:
+            st.markdown("#### 💡 Key Insights")
+            if not composition_data_for_analysis.empty:
+                st.markdown(f"""
+                <div class="metric-container">
+                    <h4>Total Debt</h4>
+                    <h2>${composition_insight['total_billions']:.1f}B</h2>
+                </div>
+                """, unsafe_allow_html=True)
+
+                st.markdown(f"""
+                <div class="insight-box">
+                <strong>Largest Component:</strong><br>
+                {composition_insight['largest_name']}<br>
+                <strong>${composition_insight['largest_billions']:.1f}B</strong>
+                ({composition_insight['largest_pct']:.1f}% of total)
+                </div>
+                """, unsafe_allow_html=True)
+
+                st.markdown(f"""
+                <div class="insight-box">
+                <strong>🏛️ Public Sector Debt:</strong><br>
+                ${composition_insight['public_billions']:.1f}B ({composition_insight['public_pct']:.1f}%)<br><br>
+                <strong>🏢 Private Sector Debt:</strong><br>
+                ${composition_insight['private_billions']:.1f}B ({composition_insight['private_pct']:.1f}%)
+                </div>
+                """, unsafe_allow_html=True)
+
+                # Show number of available indicators
+                st.markdown(f"📊 **Available indicators in {selected_year_for_analysis}:** {composition_insight['indicators']} out of {len(DEBT_COMPOSITION_INDICATORS)}")
+
+                if country == "Lebanon":
+                    st.markdown(f"""
+                <div class="insight-box">
+                <strong>🎯 Key Finding:</strong><br>
+                {country}'s external debt is primarily a <strong>public sector issue</strong> with {composition_insight['public_pct']:.1f}% government responsibility vs only {composition_insight['private_pct']:.1f}% private sector responsibility.
+                </div>
+                """, unsafe_allow_html=True)
+            else:
+                st.markdown(f"No debt data available for {selected_year_for_analysis}")
+
+    finish_timings(timings)
+
+composition_section()
+
+# -------------------- VISUALIZATION 3: PUBLIC VS PRIVATE SHARE OVER TIME --------------------
+# Read straight from the composition table; it does not depend on the
+# selected year, so it stays outside the fragment.
+with page_timings.section("public_share_chart"):
+    st.markdown(f"#### 🏛️ Public vs Private Share of {country}'s Debt Over Time")
+    years_reported = composition_table.years[composition_table.columns["total"] > 0]
+    if len(years_reported):
+        fig3_key = (
+            "public_share",
+            (int(years_reported[0]), int(years_reported[-1])),
+            tuple(DEBT_COMPOSITION_INDICATORS),
         )
-        fig2.update_traces(textposition='inside', textinfo='percent+label')
-        fig2.update_layout(
-            font=dict(size=12),
-            showlegend=True,
-            height=500
+        fig3 = figure_cache.get_or_build(
+            fig3_key,
+            page_timings.cached("public_share_figure", lambda: build_public_share_figure(composition_table.frame, country)),
+            version,
         )
-        
-        st.plotly_chart(fig2, use_container_width=True)
-        
-        st.markdown(f"""
-        **📊 Analysis of Lebanon's Debt Composition ({selected_year_for_analysis}):**
-        This pie chart clearly demonstrates that Lebanon's external debt crisis is primarily a **public sector responsibility**, not a private sector or banking sector issue. The visualization shows that Public and Publicly Guaranteed Debt, along with Multilateral Debt (including World Bank debt), constitute the overwhelming majority of Lebanon's external obligations. Private debt and private non-guaranteed commercial debt represent only a small fraction of total external debt. This pattern indicates that Lebanon's debt problems stem from government fiscal policies, public spending decisions, and sovereign borrowing rather than private sector over-borrowing or banking sector excesses. The dominance of public debt highlights the need for fiscal reform and public sector restructuring as key solutions to Lebanon's debt crisis.
-        """)
-        
+        page_timings.payload("public_share_figure", figure_cache.payload_bytes(fig3_key))
+        st.plotly_chart(fig3, use_container_width=True)
     else:
-        st.warning(f"No debt composition data available for {selected_year_for_analysis}. Try selecting a different year.")
-
-with col2:
-    st.markdown("#### 💡 Key Insights")
-    if not composition_data_for_analysis.empty:
-        total_debt = composition_data_for_analysis['Value_Billions'].sum()
-        largest_component = composition_data_for_analysis.loc[composition_data_for_analysis['Value_Billions'].idxmax()]
-        
-        st.markdown(f"""
-        <div class="metric-container">
-            <h4>Total Debt</h4>
-            <h2>${total_debt:.1f}B</h2>
-        </div>
-        """, unsafe_allow_html=True)
-        
-        st.markdown(f"""
-        <div class="insight-box">
-        <strong>Largest Component:</strong><br>
-        {largest_component['Indicator Name']}<br>
-        <strong>${largest_component['Value_Billions']:.1f}B</strong>
-        ({largest_component['Value_Billions']/total_debt*100:.1f}% of total)
-        </div>
-        """, unsafe_allow_html=True)
-        
-        # Calculate public vs private debt
-        public_debt_categories = [
-            "Public and publicly guaranteed debt (US$)",
-            "Multilateral debt (US$)",
-            "World Bank debt outstanding (US$)",
-            "Public commercial bank debt (US$)",
-            "Other public bank debt (US$)"
-        ]
-        
-        private_debt_categories = [
-            "Private debt (US$)",
-            "Private sector debt, other (US$)",
-            "Private non-guaranteed commercial debt (US$)"
-        ]
-        
-        public_debt = composition_data_for_analysis[
-            composition_data_for_analysis['Indicator Name'].isin(public_debt_categories)
-        ]['Value_Billions'].sum()
-        
-        private_debt = composition_data_for_analysis[
-            composition_data_for_analysis['Indicator Name'].isin(private_debt_categories)
-        ]['Value_Billions'].sum()
-        
-        public_pct = (public_debt / total_debt * 100) if total_debt > 0 else 0
-        private_pct = (private_debt / total_debt * 100) if total_debt > 0 else 0
-        
-        st.markdown(f"""
-        <div class="insight-box">
-        <strong>🏛️ Public Sector Debt:</strong><br>
-        ${public_debt:.1f}B ({public_pct:.1f}%)<br><br>
-        <strong>🏢 Private Sector Debt:</strong><br>
-        ${private_debt:.1f}B ({private_pct:.1f}%)
-        </div>
-        """, unsafe_allow_html=True)
-        
-        # Show number of available indicators
-        num_indicators = len(composition_data_for_analysis)
-        st.markdown(f"📊 **Available indicators in {selected_year_for_analysis}:** {num_indicators} out of 9")
-        
-        st.markdown(f"""
-        <div class="insight-box">
-        <strong>🎯 Key Finding:</strong><br>
-        Lebanon's external debt is primarily a <strong>public sector issue</strong> with {public_pct:.1f}% government responsibility vs only {private_pct:.1f}% private sector responsibility.
-        </div>
-        """, unsafe_allow_html=True)
-    else:
-        st.markdown(f"No debt data available for {selected_year_for_analysis}")
+        st.markdown(f"No debt composition data available for {country}")
 
 # -------------------- CONTEXTUAL INFORMATION --------------------
 st.markdown("---")
@@ -439,12 +532,76 @@ with st.expander("ℹ️ Data Sources and Definitions"):
     """)
 
 # -------------------- RAW DATA FRAME --------------------
-st.markdown("---")
-st.markdown("### 📋 **Raw Data**")
-st.markdown("*Expand the section below to view the full, unfiltered data frame.*")
-
-with st.expander("View Raw Data"):
-    st.dataframe(df)
+# Filters resolve to row positions once per distinct selection; only the
+# visible page is ever sent to the browser.
+@st.cache_data(max_entries=64)
+def filter_raw_rows(country, version, _df, indicators, year_range, search, _timings=None):
+    if _timings is not None:
+        _timings.cache("raw_rows", hit=False)
+    return matching_rows(_df, indicators, year_range, search)
+
+@st.fragment
+def raw_data_section():
+    timings = RenderTimings("raw_data_section", country=country)
+    st.markdown("---")
+    st.markdown("### 📋 **Raw Data**")
+    st.markdown("*Expand the section below to browse, filter and download the data frame page by page.*")
+
+    with st.expander("View Raw Data"):
+        min_year = int(cube.years[0])
+        max_year = int(cube.years[-1])
+
+        col1, col2 = st.columns(2)
+        with col1:
+            raw_indicators = st.multiselect(
+                "Indicators",
+                options=sorted(df['Indicator Name'].cat.categories),
+                help="Leave empty to include every indicator"
+            )
+            raw_search = st.text_input("Search indicator codes and names")
+        with col2:
+            if min_year < max_year:
+                raw_years = st.slider("Years", min_value=min_year, max_value=max_year, value=(min_year, max_year))
+            else:
+                raw_years = (min_year, max_year)
+                st.caption(f"Years: {min_year}")
+            raw_columns = st.multiselect("Columns", options=list(df.columns), default=list(df.columns))
+
+        with timings.section("raw_filter"):
+            timings.cache("raw_rows", hit=True)
+            rows = filter_raw_rows(country, version, df, tuple(raw_indicators), tuple(raw_years), raw_search, timings)
+
+        if not raw_columns:
+            st.info("Select at least one column to display.")
+        elif len(rows) == 0:
+            st.info("No rows match the selected filters.")
+        else:
+            col1, col2 = st.columns(2)
+            with col1:
+                page_size = st.selectbox("Rows per page", options=PAGE_SIZES, index=1)
+            with col2:
+                page = st.number_input("Page", min_value=1, max_value=page_count(len(rows), page_size), value=1)
+
+            with timings.section("raw_page"):
+                raw_page = page_frame(df, rows, raw_columns, page, page_size)
+                timings.payload("raw_page", raw_page.memory_usage(deep=True).sum())
+                st.dataframe(raw_page, hide_index=True)
+            first_row = (page - 1) * page_size + 1
+            last_row = min(page * page_size, len(rows))
+            st.caption(f"Rows {first_row:,}–{last_row:,} of {len(rows):,}")
+
+            # The CSV is only generated when the button is clicked, outside the
+            # script run.
+            st.download_button(
+                "⬇️ Download filtered data (CSV)",
+                data=lambda: csv_bytes(df, rows, raw_columns),
+                file_name="external_debt_filtered.csv",
+                mime="text/csv"
+            )
+
+    finish_timings(timings)
+
+raw_data_section()
 
 # -------------------- FOOTER --------------------
 st.markdown("---")
@@ -454,3 +611,42 @@ st.markdown("""
     <p>💡 Use the interactive features above to explore debt patterns and generate insights</p>
 </div>
 """, unsafe_allow_html=True)
+
+finish_timings(page_timings)
+
+# -------------------- DEBUG PANEL --------------------
+# Shows the last recorded run of the page and of each fragment; a fragment
+# rerun on its own is picked up on the next refresh.
+@st.fragment
+def debug_panel():
+    st.markdown("### ⏱️ Render Timings")
+    st.button("Refresh timings")
+    for unit, record in st.session_state.get('render_timings', {}).items():
+        st.markdown(f"**{unit}**: {record['total_ms']:.1f} ms")
+        if record['sections_ms']:
+            st.dataframe(
+                pd.Series(record['sections_ms'], name="ms").rename_axis("section").reset_index(),
+                hide_index=True
+            )
+        if record['caches']:
+            st.caption("Caches: " + ", ".join(f"{name} {status}" for name, status in record['caches'].items()))
+        if record['payload_bytes']:
+            st.caption("Payloads: " + ", ".join(f"{name} {size / 1024:,.1f} KB" for name, size in record['payload_bytes'].items()))
+    stats = figure_cache.stats()
+    st.caption(
+        f"Figure cache: {stats['size']}/{stats['maxsize']} figures, {stats['hits']} hits, "
+        f"{stats['misses']} misses, {stats['evictions']} evictions, {stats['invalidations']} invalidations"
+    )
+    stats = insights.stats()
+    st.caption(
+        f"Insights: {stats['precomputed']} precomputed, {stats['size']}/{stats['maxsize']} on demand, "
+        f"{stats['hits']} hits, {stats['misses']} misses, {stats['evictions']} evictions"
+    )
+    st.caption(f"Store: {store.resident_bytes() / 1e6:,.2f} MB of partitions resident")
+    watcher = get_watcher()
+    if watcher is not None and watcher.last_error is not None:
+        st.error(f"Snapshot ingest failing: {watcher.last_error!r}")
+
+if DEBUG_PANEL:
+    with st.sidebar:
+        debug_panel()
@@ -0,0 +1,147 @@
+"""Check the incremental and vectorized paths against plain references.
+
+Incremental derived indicators must equal a full rebuild. The store
+publishes a synthetic export and then three revisions: one revised cell,
+a new year and a removed observation. After each one, ``DerivedCache``
+updates from the store's change record, and the result is compared with
+``derive`` over the new cube. The recorded changes are compared with the
+edits that were made. ``lttb`` is compared with a direct loop
+implementation of the algorithm::
+
+    python -m benchmarks.consistency
+
+Exits non-zero on the first mismatch.
+"""
+import sys
+import tempfile
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+from benchmarks.synthetic import synthetic_export
+from debtleb.cube import build_cube
+from debtleb.derived import DerivedCache, derive
+from debtleb.downsample import lttb
+from debtleb.indicators import INDICATOR_NAMES
+from debtleb.store import PartitionStore, ensure_store
+
+COUNTRY = "Lebanon"
+# Synthetic series renamed to the operands of the derived ratios that the
+# synthetic export does not carry.
+OPERANDS = {
+    "XX.SYN.0000.CD": "NY.GNP.MKTP.CD",
+    "XX.SYN.0001.CD": "FI.RES.TOTL.CD",
+    "XX.SYN.0002.CD": "DT.TDS.DECT.CD",
+}
+
+
+def lttb_reference(x, y, threshold):
+    """Largest-Triangle-Three-Buckets as the loop of Steinarsson (2013)."""
+    n = len(x)
+    if threshold >= n or threshold < 3:
+        return list(range(n))
+    def edge(i):
+        return i * (n - 2) // (threshold - 2) + 1
+
+    keep = [0]
+    a = 0
+    for i in range(threshold - 2):
+        next_lo = edge(i + 1)
+        next_hi = min(edge(i + 2), n)
+        avg_x = sum(x[next_lo:next_hi]) / (next_hi - next_lo)
+        avg_y = sum(y[next_lo:next_hi]) / (next_hi - next_lo)
+        best, best_area = None, -1.0
+        for j in range(edge(i), edge(i + 1)):
+            area = abs((x[a] - avg_x) * (y[j] - y[a]) - (x[a] - x[j]) * (avg_y - y[a]))
+            if area > best_area:
+                best, best_area = j, area
+        keep.append(best)
+        a = best
+    keep.append(n - 1)
+    return keep
+
+
+def check_lttb(rng):
+    for n, threshold in [(10, 3), (100, 7), (1000, 50), (5000, 300), (2001, 2000), (100_000, 2000)]:
+        x = np.sort(rng.uniform(0, 1000, n))
+        y = rng.normal(size=n).cumsum()
+        got = lttb(x, y, threshold).tolist()
+        expected = lttb_reference(x.tolist(), y.tolist(), threshold)
+        if got != expected:
+            return f"lttb n={n} threshold={threshold}: kept {got[:8]}... expected {expected[:8]}..."
+    return None
+
+
+def publish(export, directory, name, store_dir):
+    path = Path(directory) / f"{name}_20240101_000000.csv"
+    export.to_csv(path, index=False)
+    ensure_store([path], store_dir)
+
+
+def check_incremental(directory):
+    export = synthetic_export(1)
+    export = export[export["refArea"].str.endswith(f"/{COUNTRY}")].reset_index(drop=True)
+    export["Indicator Code"] = export["Indicator Code"].replace(OPERANDS)
+    store_dir = Path(directory) / "store"
+    publish(export, directory, "v0", store_dir)
+    store = PartitionStore(store_dir, INDICATOR_NAMES)
+    cache = DerivedCache()
+    cache.get(build_cube(store.get(COUNTRY)), store.version(COUNTRY))
+
+    total = export["Indicator Code"] == "DT.DOD.DECT.CD"
+    revised = export.copy()
+    revised.loc[revised.index[total][len(revised[total]) // 2], "Value"] *= 1.1
+    added = revised.copy()
+    new_rows = added[added["Indicator Code"].isin(["DT.DOD.DECT.CD", "NY.GNP.MKTP.CD"])]
+    new_rows = new_rows.loc[new_rows.groupby("Indicator Code")["refPeriod"].idxmax()].assign(refPeriod=2023)
+    added = pd.concat([added, new_rows], ignore_index=True)
+    removed = added.drop(added.index[added["Indicator Code"] == "FI.RES.TOTL.CD"][0])
+
+    previous = export
+    for name, export in [("revised", revised), ("added", added), ("removed", removed)]:
+        publish(export, directory, name, store_dir)
+        store.refresh()
+        cube = build_cube(store.get(COUNTRY))
+        changes = store.changes(COUNTRY)
+        expected = edited_cells(previous, export)
+        recorded = (set(changes["indicators"]), set(changes["years"]))
+        if recorded != (set(code for code, _ in expected), set(year for _, year in expected)):
+            return f"{name}: recorded changes {recorded}, edited cells {sorted(expected)}"
+
+        builds = cache.incremental_builds
+        incremental = cache.get(cube, store.version(COUNTRY), changes)
+        if cache.incremental_builds != builds + 1:
+            return f"{name}: the cache rebuilt in full instead of incrementally"
+        full = derive(cube)
+        if not (np.array_equal(incremental.years, full.years)
+                and np.array_equal(incremental.values, full.values, equal_nan=True)):
+            diff = ~np.isclose(incremental.values, full.values, equal_nan=True)
+            return f"{name}: incremental derive differs from a full rebuild in {int(diff.sum())} cells"
+        previous = export
+    return None
+
+
+def edited_cells(old, new):
+    def cells(frame):
+        frame = frame[frame["refArea"].str.endswith(f"/{COUNTRY}")]
+        return dict(zip(zip(frame["Indicator Code"], frame["refPeriod"].astype(int)), frame["Value"]))
+    old, new = cells(old), cells(new)
+    return {key for key in old.keys() | new.keys() if old.get(key) != new.get(key)}
+
+
+def main():
+    failures = 0
+    with tempfile.TemporaryDirectory() as directory:
+        for name, check in [
+            ("lttb", lambda: check_lttb(np.random.default_rng(0))),
+            ("incremental_derive", lambda: check_incremental(directory)),
+        ]:
+            error = check()
+            print(f"{name:<20} {'ok' if error is None else 'FAILED: ' + error}", flush=True)
+            failures += error is not None
+    sys.exit(1 if failures else 0)
+
+
+if __name__ == "__main__":
+    main()
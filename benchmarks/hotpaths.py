@@ -0,0 +1,222 @@
+"""Time and memory-profile the dashboard's data and rendering hot paths.
+
+Runs headlessly against synthetic exports (see ``benchmarks.synthetic``)
+at several multiples of the real export's size and writes one JSON file
+per run, so results can be compared between commits::
+
+    python -m benchmarks.hotpaths --scales 1 10 100 1000
+    python -m benchmarks.hotpaths --compare benchmarks/results/<old>.json
+
+Each stage is timed ``--repeats`` times and then run once more under
+``tracemalloc`` for its peak traced allocation. Allocations made inside
+Arrow are not traced; ``peak_bytes`` covers the Python heap and NumPy.
+"""
+import argparse
+import gc
+import json
+import platform
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+import tracemalloc
+from datetime import datetime, timezone
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+import plotly
+import plotly.io as pio
+
+from benchmarks.synthetic import DASHBOARD_CODES, layout, write_synthetic_export
+from debtleb.charts import build_composition_figure, build_period_figure
+from debtleb.composition import build_composition_panel, build_composition_table
+from debtleb.cube import build_cube
+from debtleb.derived import derive
+from debtleb.indicators import (
+    DEBT_COMPOSITION_INDICATORS, KEY_DEBT_INDICATORS, PERIODS, PRIVATE_DEBT_CATEGORIES, PUBLIC_DEBT_CATEGORIES,
+)
+from debtleb.ingest import process_export, read_export
+from debtleb.insights import build_insights
+from debtleb.rangestats import build_range_index, range_stats
+from debtleb.store import PartitionStore, build_store
+
+try:
+    import resource
+except ImportError:  # Windows
+    resource = None
+
+RESULTS_DIR = Path(__file__).parent / "results"
+DEFAULT_SCALES = [1, 10, 100, 1000]
+COUNTRY = "Lebanon"
+
+def measure(fn, repeats):
+    timings = []
+    for _ in range(repeats):
+        gc.collect()
+        start = time.perf_counter()
+        fn()
+        timings.append(time.perf_counter() - start)
+    gc.collect()
+    tracemalloc.start()
+    fn()
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return {
+        "seconds_min": min(timings),
+        "seconds_median": statistics.median(timings),
+        "repeats": repeats,
+        "peak_bytes": peak,
+    }
+
+
+def run_scale(scale, workdir, repeats):
+    csv_path = write_synthetic_export(scale, workdir)
+    store_dir = Path(workdir) / f"store-x{scale}"
+    manifest = build_store([csv_path], store_dir)
+    store = PartitionStore(store_dir, DASHBOARD_CODES)
+    df = store.get(COUNTRY)
+    cube = build_cube(df)
+    index = build_range_index(cube)
+    composition = build_composition_table(cube, DEBT_COMPOSITION_INDICATORS, PUBLIC_DEBT_CATEGORIES, PRIVATE_DEBT_CATEGORIES)
+    insights = build_insights(cube, composition, COUNTRY)
+    key_cols = cube.columns_for(KEY_DEBT_INDICATORS)
+    all_cols = list(range(len(cube.names)))
+    years = [int(year) for year in cube.years]
+
+    def store_build():
+        with tempfile.TemporaryDirectory(dir=workdir) as tmp:
+            build_store([csv_path], tmp)
+
+    def all_countries():
+        fresh = PartitionStore(store_dir, DASHBOARD_CODES, memory_budget_mb=1 << 20)
+        cubes = {country: build_cube(fresh.get(country)) for country in fresh.countries()}
+        for cube in cubes.values():
+            build_range_index(cube)
+        build_composition_panel(cubes, DEBT_COMPOSITION_INDICATORS, PUBLIC_DEBT_CATEGORIES, PRIVATE_DEBT_CATEGORIES)
+
+    def period_figures():
+        for period in PERIODS.values():
+            data = cube.long_frame(cube.rows_between(*period), key_cols)
+            pio.to_json(build_period_figure(data, period, COUNTRY), validate=False)
+
+    # Three long series, 1,000 points each per unit of scale, for the
+    # WebGL/LTTB chart mode.
+    rng = np.random.default_rng(0)
+    long_points = 1000 * scale
+    long_series = pd.DataFrame({
+        "refPeriod": np.tile(np.arange(long_points), len(KEY_DEBT_INDICATORS)),
+        "Indicator Name": np.repeat(KEY_DEBT_INDICATORS, long_points),
+        "Value_Billions": rng.normal(size=long_points * len(KEY_DEBT_INDICATORS)).cumsum(),
+    })
+
+    def composition_figures():
+        for year in years[-10:]:
+            split = composition.split(year)
+            data = cube.long_frame(slice(split["row"], split["row"] + 1), split["cols"])
+            pio.to_json(build_composition_figure(data, year), validate=False)
+
+    stages = {
+        "csv_ingest": lambda: process_export(read_export(csv_path, with_country=True)),
+        "store_build": store_build,
+        "partition_load": lambda: PartitionStore(store_dir, DASHBOARD_CODES).get(COUNTRY),
+        "cube_build": lambda: build_cube(df),
+        "range_index_build": lambda: build_range_index(cube),
+        "all_countries_cube": all_countries,
+        "derived_indicators": lambda: derive(cube),
+        "period_filter": lambda: [cube.long_frame(cube.rows_between(*period), key_cols) for period in PERIODS.values()],
+        "period_stats": lambda: [range_stats(index, *period, all_cols) for period in PERIODS.values()],
+        "composition_table": lambda: build_composition_table(
+            cube, DEBT_COMPOSITION_INDICATORS, PUBLIC_DEBT_CATEGORIES, PRIVATE_DEBT_CATEGORIES
+        ),
+        "composition_split": lambda: [composition.split(year) for year in years],
+        "insights_build": lambda: build_insights(cube, composition, COUNTRY),
+        "insights_lookup": lambda: (
+            [insights.period(label, period) for label, period in PERIODS.items()]
+            + [insights.composition(year) for year in years]
+        ),
+        "figure_period": period_figures,
+        "figure_composition": composition_figures,
+        "figure_period_large": lambda: pio.to_json(
+            build_period_figure(long_series, (0, long_points - 1), COUNTRY), validate=False
+        ),
+    }
+
+    countries, indicators = layout(scale)
+    result = {
+        "rows": sum(entry["rows"] for entry in manifest["partitions"].values()),
+        "countries": countries,
+        "indicators_per_country": indicators,
+        "stages": {},
+    }
+    for name, fn in stages.items():
+        result["stages"][name] = measure(fn, repeats)
+        print(f"  x{scale:<5} {name:<20} {result['stages'][name]['seconds_median'] * 1000:10.2f} ms"
+              f" {result['stages'][name]['peak_bytes'] / 1e6:10.2f} MB", flush=True)
+    return result
+
+
+def git_commit():
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"], capture_output=True, text=True, check=True
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return "unknown"
+
+
+def compare(current, baseline_path):
+    baseline = json.loads(Path(baseline_path).read_text())
+    print(f"\nmedian time vs {baseline['commit']} (new / old)")
+    for scale, result in current["scales"].items():
+        old = baseline["scales"].get(scale)
+        if old is None:
+            continue
+        for stage, stats in result["stages"].items():
+            if stage in old["stages"]:
+                ratio = stats["seconds_median"] / old["stages"][stage]["seconds_median"]
+                print(f"  x{scale:<5} {stage:<20} {ratio:6.2f}x")
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--scales", type=int, nargs="+", default=DEFAULT_SCALES)
+    parser.add_argument("--repeats", type=int, default=5)
+    parser.add_argument("--workdir", help="where synthetic exports and stores are kept (reused between runs)")
+    parser.add_argument("--output", help="results file (default: benchmarks/results/<commit>.json)")
+    parser.add_argument("--compare", help="earlier results file to compare against")
+    args = parser.parse_args(argv)
+
+    workdir = Path(args.workdir or Path(tempfile.gettempdir()) / "debtleb-bench")
+    workdir.mkdir(parents=True, exist_ok=True)
+    commit = git_commit()
+    results = {
+        "commit": commit,
+        "timestamp": datetime.now(timezone.utc).isoformat(timespec="seconds"),
+        "platform": platform.platform(),
+        "versions": {
+            "python": platform.python_version(),
+            "numpy": np.__version__,
+            "pandas": pd.__version__,
+            "plotly": plotly.__version__,
+        },
+        "scales": {},
+    }
+    for scale in args.scales:
+        results["scales"][str(scale)] = run_scale(scale, workdir, args.repeats)
+    if resource is not None:
+        # ru_maxrss is in KiB on Linux and bytes on macOS.
+        maxrss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+        results["max_rss_bytes"] = maxrss if sys.platform == "darwin" else maxrss * 1024
+
+    output = Path(args.output) if args.output else RESULTS_DIR / f"{commit}.json"
+    output.parent.mkdir(parents=True, exist_ok=True)
+    output.write_text(json.dumps(results, indent=2))
+    print(f"\nwrote {output}")
+    if args.compare:
+        compare(results, args.compare)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,334 @@
+"""Multi-session load test of the dashboard on Streamlit's AppTest.
+
+Each simulated session is an ``AppTest`` of ``app.py`` driven through a
+random interaction script: switching between predefined periods, entering
+custom ranges, changing the composition year, and searching and paging the
+raw data view::
+
+    python -m benchmarks.loadtest --sessions 1 4 16 --steps 20
+
+By default, all sessions of a run live in one fresh spawned process, as
+they would on one server, and share its resource caches and the published
+store. AppTest installs a process-wide mock Runtime for every run and
+removes it afterwards, so two reruns cannot overlap in one process:
+sessions take turns, one interaction each per round. The round time is
+what a viewer waits when every session acts at once on a process that
+serializes script runs on the GIL. Resident memory is measured after a
+warm-up run and again with every session open, and the growth is reported
+per session. These are the numbers for sizing one server.
+
+``--isolated`` instead runs every session in its own spawned process, with
+its own caches, loading and interacting at the same time. It measures
+contention between N separate servers on the machine's cores, and its
+memory is per process. It must not be used to size a single server.
+
+Every run warms its caches with a throwaway session first, so a session's
+first load is that of a new viewer on a warm server. AppTest reruns the
+whole script on every interaction, including interactions inside
+fragments, and compiles the script on every run, so latencies are an upper
+bound on what a browser session sees.
+"""
+import argparse
+import gc
+import json
+import multiprocessing
+import os
+import random
+import statistics
+import time
+from concurrent.futures import ProcessPoolExecutor
+from datetime import datetime, timezone
+from pathlib import Path
+
+import numpy as np
+import streamlit.logger
+from streamlit.testing.v1 import AppTest
+
+from benchmarks.hotpaths import RESULTS_DIR, git_commit
+from debtleb.indicators import CUSTOM_PERIOD
+
+APP = Path(__file__).resolve().parent.parent / "app.py"
+DEFAULT_SESSIONS = [1, 4, 16]
+RUN_TIMEOUT = 120
+SEARCHES = ["debt", "DT.DOD", "reserves", "IMF", ""]
+
+_barrier = None
+
+
+def rss_bytes():
+    """Current resident set size, from /proc on Linux and the peak elsewhere."""
+    try:
+        with open("/proc/self/statm") as f:
+            return int(f.read().split()[1]) * os.sysconf("SC_PAGE_SIZE")
+    except OSError:
+        import resource
+        return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss * 1024
+
+
+def widget(at, kind, label):
+    for element in getattr(at, kind):
+        if element.label == label:
+            return element
+    raise LookupError(f"No {kind} labelled {label!r}")
+
+
+# Interactions. Each sets widgets and reruns through ``rerun``, which
+# records the latency.
+
+def pick_period(at, rng, rerun):
+    radio = widget(at, "radio", "Choose Time Period to Analyze:")
+    radio.set_value(rng.choice([option for option in radio.options if option != CUSTOM_PERIOD]))
+    rerun()
+
+
+def custom_range(at, rng, rerun):
+    radio = widget(at, "radio", "Choose Time Period to Analyze:")
+    if radio.value != CUSTOM_PERIOD:
+        radio.set_value(CUSTOM_PERIOD)
+        rerun()
+    start = widget(at, "number_input", "Start Year")
+    end = widget(at, "number_input", "End Year")
+    first = rng.randint(int(start.min), int(end.max) - 1)
+    start.set_value(first)
+    rerun()
+    end.set_value(rng.randint(first + 1, int(end.max)))
+    rerun()
+
+
+def pick_year(at, rng, rerun):
+    year = widget(at, "selectbox", "Choose Year for Analysis:")
+    year.select_index(rng.randrange(len(year.options)))
+    rerun()
+
+
+def browse_raw_data(at, rng, rerun):
+    widget(at, "text_input", "Search indicator codes and names").input(rng.choice(SEARCHES))
+    rerun()
+    try:
+        page_size = widget(at, "selectbox", "Rows per page")
+    except LookupError:  # nothing matched the search
+        return
+    page_size.select_index(rng.randrange(len(page_size.options)))
+    rerun()
+    page = widget(at, "number_input", "Page")
+    page.set_value(rng.randint(1, int(page.max)))
+    rerun()
+
+
+INTERACTIONS = [
+    (4, pick_period),
+    (2, custom_range),
+    (4, pick_year),
+    (1, browse_raw_data),
+]
+
+
+class Session:
+    def __init__(self, seed):
+        self.rng = random.Random(seed)
+        self.seed = seed
+        self.at = AppTest.from_file(str(APP), default_timeout=RUN_TIMEOUT)
+        self.latencies = []
+
+    def rerun(self):
+        start = time.perf_counter()
+        self.at.run()
+        elapsed = time.perf_counter() - start
+        if self.at.exception:
+            raise RuntimeError(f"session {self.seed}: {[e.value for e in self.at.exception]}")
+        self.latencies.append(elapsed)
+
+    def interact(self, steps):
+        weights, actions = zip(*INTERACTIONS)
+        for _ in range(steps):
+            self.rng.choices(actions, weights)[0](self.at, self.rng, self.rerun)
+
+
+def _init_worker(barrier):
+    global _barrier
+    _barrier = barrier
+    # Bare-mode and deprecation warnings would repeat on every rerun.
+    streamlit.logger.set_log_level("error")
+
+
+def _spawn_pool(workers, barrier=None):
+    # Workers are spawned so each starts without caches. The parent never
+    # runs AppTest itself: it replaces the running process's __main__
+    # module, through which workers are spawned.
+    context = multiprocessing.get_context("spawn")
+    return ProcessPoolExecutor(workers, mp_context=context, initializer=_init_worker, initargs=(barrier,))
+
+
+def publish_store(seed):
+    Session(seed).rerun()
+
+
+def summarize(sessions, steps, latencies, wall, first_loads):
+    ms = np.asarray(latencies) * 1000
+    return {
+        "sessions": sessions,
+        "steps_per_session": steps,
+        "reruns": len(latencies),
+        "wall_seconds": wall,
+        "reruns_per_second": len(latencies) / wall,
+        "first_load_ms": statistics.fmean(first_loads) * 1000,
+        "latency_ms": {
+            "p50": float(np.percentile(ms, 50)),
+            "p95": float(np.percentile(ms, 95)),
+            "p99": float(np.percentile(ms, 99)),
+            "mean": statistics.fmean(ms),
+            "max": float(ms.max()),
+        },
+    }
+
+
+def run_shared(sessions, steps, seed):
+    """Serve every session from this process, one interaction each per round."""
+    Session(seed - 1_000_000).rerun()
+    gc.collect()
+    rss_before = rss_bytes()
+    opened = [Session(seed + i) for i in range(sessions)]
+    first_loads = []
+    for session in opened:
+        session.rerun()
+        first_loads.append(session.latencies.pop())
+
+    rounds = []
+    started = time.perf_counter()
+    for _ in range(steps):
+        round_start = time.perf_counter()
+        for session in opened:
+            session.interact(1)
+        rounds.append(time.perf_counter() - round_start)
+    wall = time.perf_counter() - started
+    gc.collect()
+    rss_after = rss_bytes()
+
+    latencies = [latency for session in opened for latency in session.latencies]
+    run = summarize(sessions, steps, latencies, wall, first_loads)
+    round_ms = np.asarray(rounds) * 1000
+    run.update({
+        "mode": "shared",
+        # Every session interacting once, in turn.
+        "round_ms": {
+            "p50": float(np.percentile(round_ms, 50)),
+            "p95": float(np.percentile(round_ms, 95)),
+            "max": float(round_ms.max()),
+        },
+        # The warm process, and what each open session added to it.
+        "rss_process_bytes": rss_after,
+        "rss_per_session_bytes": (rss_after - rss_before) / sessions,
+    })
+    return run
+
+
+def run_session(seed, steps):
+    """Warm up, then open one session and drive it, in step with the other workers."""
+    try:
+        Session(seed - 1_000_000).rerun()
+        rss_before = rss_bytes()
+        # Sessions arrive together once every worker is warm, then start
+        # interacting together once every one has loaded.
+        _barrier.wait(timeout=RUN_TIMEOUT)
+        session = Session(seed)
+        session.rerun()
+        first_load = session.latencies.pop()
+        _barrier.wait(timeout=RUN_TIMEOUT)
+        started = time.monotonic()
+        session.interact(steps)
+        finished = time.monotonic()
+    except BaseException:
+        # Release the other workers instead of leaving them at the barrier.
+        _barrier.abort()
+        raise
+    return {
+        "first_load": first_load,
+        "latencies": session.latencies,
+        "started": started,
+        "finished": finished,
+        "rss_before": rss_before,
+        "rss_after": rss_bytes(),
+    }
+
+
+def run_isolated(sessions, steps, seed):
+    barrier = multiprocessing.get_context("spawn").Barrier(sessions)
+    # One worker per session: each blocks at the barrier, so no worker can
+    # take a second session.
+    with _spawn_pool(sessions, barrier) as pool:
+        futures = [pool.submit(run_session, seed + i, steps) for i in range(sessions)]
+        results = [future.result() for future in futures]
+
+    latencies = [latency for result in results for latency in result["latencies"]]
+    wall = max(result["finished"] for result in results) - min(result["started"] for result in results)
+    run = summarize(sessions, steps, latencies, wall, [result["first_load"] for result in results])
+    run.update({
+        "mode": "isolated",
+        # Per session process: warm caches plus one live session, and what
+        # the session itself added.
+        "rss_per_process_bytes": statistics.fmean(result["rss_after"] for result in results),
+        "rss_per_session_bytes": statistics.fmean(result["rss_after"] - result["rss_before"] for result in results),
+    })
+    return run
+
+
+def run_load(sessions, steps, seed, isolated=False):
+    if isolated:
+        return run_isolated(sessions, steps, seed)
+    # A fresh process per run, so memory freed by a previous run cannot
+    # hide this run's growth.
+    with _spawn_pool(1) as pool:
+        return pool.submit(run_shared, sessions, steps, seed).result()
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--sessions", type=int, nargs="+", default=DEFAULT_SESSIONS)
+    parser.add_argument("--steps", type=int, default=20, help="interactions per session")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--isolated", action="store_true",
+                        help="one process per session; not for sizing a single server")
+    parser.add_argument("--output", help="results file (default: benchmarks/results/loadtest-<commit>.json)")
+    args = parser.parse_args(argv)
+
+    # The app resolves its export and store relative to the repository root.
+    os.chdir(APP.parent)
+    # Publish the store once, before sessions start reading it.
+    with _spawn_pool(1) as pool:
+        pool.submit(publish_store, args.seed - 1).result()
+
+    commit = git_commit()
+    results = {
+        "commit": commit,
+        "timestamp": datetime.now(timezone.utc).isoformat(timespec="seconds"),
+        "mode": "isolated" if args.isolated else "shared",
+        "runs": [],
+    }
+    if args.isolated:
+        print("isolated: one process per session, each with its own caches."
+              " Not a measure of one server.", flush=True)
+    else:
+        print("shared: every session in one process, taking turns.", flush=True)
+    for sessions in args.sessions:
+        run = run_load(sessions, args.steps, args.seed, args.isolated)
+        results["runs"].append(run)
+        latency = run["latency_ms"]
+        line = (f"{sessions:4d} sessions  {run['reruns']:5d} reruns  {run['reruns_per_second']:7.2f}/s"
+                f"  p50 {latency['p50']:8.1f} ms  p95 {latency['p95']:8.1f} ms  p99 {latency['p99']:8.1f} ms")
+        if args.isolated:
+            line += (f"  {run['rss_per_process_bytes'] / 1e6:7.1f} MB/process"
+                     f"  {run['rss_per_session_bytes'] / 1e6:7.2f} MB/session process")
+        else:
+            line += (f"  round p50 {run['round_ms']['p50']:8.1f} ms"
+                     f"  {run['rss_process_bytes'] / 1e6:7.1f} MB process"
+                     f"  {run['rss_per_session_bytes'] / 1e6:7.2f} MB/session")
+        print(line + f"  first load {run['first_load_ms']:7.1f} ms", flush=True)
+
+    output = Path(args.output) if args.output else RESULTS_DIR / f"loadtest-{commit}.json"
+    output.parent.mkdir(parents=True, exist_ok=True)
+    output.write_text(json.dumps(results, indent=2))
+    print(f"\nwrote {output}")
+
+
+if __name__ == "__main__":
+    main()
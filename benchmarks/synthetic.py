@@ -0,0 +1,95 @@
+"""Synthetic IDS-shaped exports at multiples of the Lebanon export's size.
+
+A scale of 1 has one country with 57 indicators over 1960-2022 and about as
+many observations as the real export (2,112 rows). Larger scales add
+countries up to ``MAX_COUNTRIES`` and then widen each country's indicator
+set, so a scale of 1000 has 200 countries with 285 indicators each. Every
+country carries the indicators the dashboard charts, under their real
+codes, so the same selections can be exercised at every scale.
+"""
+import math
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+from debtleb.indicators import INDICATOR_NAMES
+
+BASE_INDICATORS = 57
+YEARS = np.arange(1960, 2023)
+# Share of (indicator, year) cells the real export actually reports.
+DENSITY = 2112 / (BASE_INDICATORS * len(YEARS))
+MAX_COUNTRIES = 200
+
+# The codes the dashboard charts, first so every country carries them.
+DASHBOARD_CODES = {
+    code: INDICATOR_NAMES[code]
+    for code in (
+        "DT.DOD.DECT.CD", "DT.DOD.DLXF.CD", "DT.DOD.DSTC.CD", "DT.DOD.DPNG.CD",
+        "DT.DOD.DPPG.CD", "DT.DOD.MWBG.CD", "DT.NFL.PCBK.CD", "DT.NFL.PCBO.CD",
+        "DT.NFL.PROP.CD", "DT.NFL.PRVT.CD", "DT.NFL.PNGC.CD",
+    )
+}
+
+
+def layout(scale):
+    """Return ``(countries, indicators per country)`` for ``scale``."""
+    countries = min(scale, MAX_COUNTRIES)
+    return countries, BASE_INDICATORS * math.ceil(scale / countries)
+
+
+def country_names(n):
+    return ["Lebanon"] + [f"Synthetic_Country_{i:03d}" for i in range(1, n)]
+
+
+def indicator_codes(n):
+    codes = list(DASHBOARD_CODES)
+    codes += [f"XX.SYN.{i:04d}.CD" for i in range(n - len(codes))]
+    return codes
+
+
+def synthetic_export(scale, seed=0):
+    """Return a long-format frame with the columns of an IDS export."""
+    rng = np.random.default_rng(seed)
+    n_countries, n_indicators = layout(scale)
+    countries = country_names(n_countries)
+    codes = indicator_codes(n_indicators)
+
+    # Multiplicative random walks starting between $100M and $100B.
+    series = n_countries * n_indicators
+    start = 10 ** rng.uniform(8, 11, size=(series, 1))
+    growth = rng.normal(1.04, 0.08, size=(series, len(YEARS))).clip(0.5, 1.8)
+    values = start * np.cumprod(growth, axis=1)
+    observed = rng.random(values.shape) < DENSITY
+
+    series_idx, year_idx = np.nonzero(observed)
+    country = np.asarray(countries)[series_idx // n_indicators]
+    code = np.asarray(codes)[series_idx % n_indicators]
+    year = YEARS[year_idx]
+    country_s = pd.Series(country)
+    code_s = pd.Series(code)
+    year_s = pd.Series(year).astype(str)
+
+    return pd.DataFrame({
+        "refArea": "http://dbpedia.org/resource/" + country_s,
+        "Indicator Code": code,
+        "Value": np.round(values[observed], -2),
+        "Observation URI": (
+            "http://linked.aub.edu.lb/CODEC/" + country_s + "/observation/external-debt-"
+            + country_s + "-" + code_s + "-" + year_s
+        ),
+        "references": "https://data.humdata.org/dataset/world-bank-external-debt-indicators-for-" + country_s.str.lower(),
+        "publisher": "The World Bank",
+        "dataset": "http://linked.aub.edu.lb/CODEC/" + country_s + "/Dataset/external-debt-" + country_s,
+        "refPeriod": year,
+    })
+
+
+def write_synthetic_export(scale, directory, seed=0):
+    """Write the export for ``scale`` into ``directory`` unless it already exists."""
+    path = Path(directory) / f"synthetic_x{scale}_seed{seed}_20240101_000000.csv"
+    if not path.exists():
+        tmp = path.with_suffix(".tmp")
+        synthetic_export(scale, seed).to_csv(tmp, index=False)
+        tmp.replace(path)
+    return path
@@ -0,0 +1,5 @@
+"""Data layer and analytics for the External Debt Interactive Dashboard.
+
+Nothing in the package imports Streamlit, and Plotly is only imported when
+a figure is built, so it can be used from batch jobs and tests.
+"""
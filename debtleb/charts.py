@@ -0,0 +1,101 @@
+"""Plotly figure builders for the dashboard charts.
+
+Plotly is imported on the first chart built rather than when this module
+is imported, so the data layer can be loaded without it.
+"""
+from debtleb.downsample import downsample_frame
+
+# Above this many points a line chart is drawn with WebGL and downsampled.
+LARGE_SERIES_POINTS = 2000
+
+
+def is_large_series(data, max_points=LARGE_SERIES_POINTS):
+    return max_points is not None and len(data) > max_points
+
+
+def build_period_figure(period_data, year_range, country, max_points=LARGE_SERIES_POINTS, downsample=True):
+    """Line chart of ``period_data``.
+
+    Above ``max_points`` points the chart switches to WebGL traces without
+    spline smoothing or markers and, unless ``downsample`` is false, each
+    series is reduced with LTTB to its share of ``max_points``.
+    """
+    import plotly.express as px
+
+    large = is_large_series(period_data, max_points)
+    if large and downsample:
+        series = max(1, period_data['Indicator Name'].nunique())
+        period_data = downsample_frame(period_data, 'refPeriod', 'Value_Billions', 'Indicator Name', max_points // series)
+    fig = px.line(
+        period_data,
+        x='refPeriod',
+        y='Value_Billions',
+        color='Indicator Name',
+        title=f"{country}'s Debt During: {year_range[0]} - {year_range[1]} (Billions USD)",
+        markers=not large,
+        line_shape='linear' if large else 'spline',
+        render_mode='webgl' if large else 'auto'
+    )
+    fig.update_layout(
+        xaxis_title="Year",
+        yaxis_title="Value (Billions USD)",
+        hovermode='x unified',
+        height=500,
+        legend=dict(yanchor="top", y=0.99, xanchor="left", x=0.01)
+    )
+    if large:
+        fig.update_traces(line=dict(width=2))
+    else:
+        fig.update_traces(line=dict(width=3), marker=dict(size=8))
+    return fig
+
+
+def build_composition_figure(composition_data, year):
+    import plotly.express as px
+
+    fig = px.pie(
+        composition_data,
+        values="Value_Billions",
+        names="Indicator Name",
+        title=f"Debt Composition in {year} (Billions USD)",
+        color_discrete_sequence=px.colors.qualitative.Set3,
+        hole=0.4
+    )
+    fig.update_traces(textposition='inside', textinfo='percent+label')
+    fig.update_layout(
+        font=dict(size=12),
+        showlegend=True,
+        height=500
+    )
+    return fig
+
+
+def build_public_share_figure(composition_table, country):
+    import plotly.express as px
+
+    reported = composition_table[composition_table["total"] > 0]
+    share_data = reported[["public_pct", "private_pct"]].rename(
+        columns={"public_pct": "Public sector", "private_pct": "Private sector"}
+    ).reset_index().melt(id_vars="refPeriod", var_name="Sector", value_name="Share")
+    fig = px.line(
+        share_data,
+        x='refPeriod',
+        y='Share',
+        color='Sector',
+        title=f"{country}'s Public vs Private Share of Debt Composition (%)",
+        markers=True
+    )
+    fig.update_layout(
+        xaxis_title="Year",
+        yaxis_title="Share of composition (%)",
+        hovermode='x unified',
+        height=400
+    )
+    return fig
+
+
+def figure_payload_bytes(fig):
+    """Size of the JSON spec ``st.plotly_chart`` sends to the browser for ``fig``."""
+    import plotly.io as pio
+
+    return len(pio.to_json(fig, validate=False))
@@ -0,0 +1,99 @@
+"""Debt composition and public/private split for every year at once.
+
+``build_composition_table`` does the per-year work the composition section
+used to repeat on every selection: dropping zero and missing components,
+summing the public and private categories, finding the largest component
+and taking percentages. It does this for all years of a cube in a few
+array operations, so a year selection becomes a row lookup and across-year
+views read straight from the table.
+"""
+import numpy as np
+import pandas as pd
+
+TABLE_COLUMNS = [
+    "row", "cols", "total", "largest_name", "largest_value",
+    "public", "private", "public_pct", "private_pct",
+]
+
+
+class CompositionTable:
+    """Per-year composition arrays, aligned with ``years``."""
+
+    def __init__(self, years, columns):
+        self.years = np.asarray(years, dtype=np.int64)
+        self.columns = columns
+        self._frame = None
+
+    def split(self, year):
+        """Return ``year``'s row as a dict, or an empty split if it is absent."""
+        pos = int(np.searchsorted(self.years, year))
+        if pos == len(self.years) or self.years[pos] != year:
+            return {
+                "row": None, "cols": [], "total": 0.0, "largest_name": None, "largest_value": np.nan,
+                "public": 0.0, "private": 0.0, "public_pct": 0, "private_pct": 0,
+            }
+        return {name: values[pos] for name, values in self.columns.items()}
+
+    @property
+    def frame(self):
+        """The table as a DataFrame indexed by ``refPeriod``, for across-year views."""
+        if self._frame is None:
+            self._frame = pd.DataFrame(self.columns, index=pd.Index(self.years, name="refPeriod"), columns=TABLE_COLUMNS)
+        return self._frame
+
+
+def build_composition_table(cube, components, public, private):
+    """Return the composition of every cube year.
+
+    ``cols`` holds the cube column positions of the year's positive
+    ``components``. ``public`` and ``private`` are the component names
+    counted towards each sector; percentages are shares of the summed
+    components and 0 when nothing is reported.
+    """
+    comp_cols = np.asarray(cube.columns_for(components), dtype=np.intp)
+    block = cube.values[:, comp_cols]
+    # NaN compares False, so missing components drop out here too.
+    present = block > 0
+    kept = np.where(present, block, 0.0)
+
+    total = kept.sum(axis=1)
+    public_total = kept[:, np.isin(comp_cols, cube.columns_for(public))].sum(axis=1)
+    private_total = kept[:, np.isin(comp_cols, cube.columns_for(private))].sum(axis=1)
+    rows = np.arange(len(block))
+    if len(comp_cols):
+        has_any = present.any(axis=1)
+        largest = np.where(present, block, -np.inf).argmax(axis=1)
+        names = np.asarray([cube.names[col] for col in comp_cols], dtype=object)
+        largest_name = np.where(has_any, names[largest], None)
+        largest_value = np.where(has_any, block[rows, largest], np.nan)
+    else:
+        largest_name = np.full(len(block), None, dtype=object)
+        largest_value = np.full(len(block), np.nan)
+
+    with np.errstate(invalid="ignore", divide="ignore"):
+        public_pct = np.where(total > 0, public_total / total * 100, 0.0)
+        private_pct = np.where(total > 0, private_total / total * 100, 0.0)
+
+    return CompositionTable(cube.years, {
+        "row": rows,
+        "cols": [comp_cols[mask].tolist() for mask in present],
+        "total": total,
+        "largest_name": largest_name,
+        "largest_value": largest_value,
+        "public": public_total,
+        "private": private_total,
+        "public_pct": public_pct,
+        "private_pct": private_pct,
+    })
+
+
+def build_composition_panel(cubes, components, public, private):
+    """Stack the tables of several countries' cubes under a ``country`` level."""
+    return pd.concat(
+        {
+            country: build_composition_table(cube, components, public, private).frame
+            for country, cube in cubes.items()
+        },
+        names=["country"],
+    )
+
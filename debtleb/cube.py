@@ -0,0 +1,75 @@
+"""Wide year x indicator cube built once from the long-format frame.
+
+Years form a sorted integer index and indicator codes the columns, with
+values (in billions USD) held in one C-contiguous float64 array. Missing
+observations are NaN. Callers slice it by position instead of scanning the
+long frame with boolean masks on every rerun.
+"""
+import numpy as np
+import pandas as pd
+
+
+class DebtCube:
+    def __init__(self, years, codes, names, values):
+        self.years = np.asarray(years, dtype=np.int64)
+        self.codes = list(codes)
+        self.names = list(names)
+        self.values = np.ascontiguousarray(values, dtype=np.float64)
+        # Several codes can share a display name, so each name maps to a
+        # tuple of column positions.
+        by_name = {}
+        for pos, name in enumerate(self.names):
+            by_name.setdefault(name, []).append(pos)
+        self._by_name = {name: tuple(positions) for name, positions in by_name.items()}
+
+    @property
+    def empty(self):
+        return self.values.size == 0
+
+    def rows_between(self, start_year, end_year):
+        """Return the row slice covering ``start_year..end_year`` inclusive."""
+        lo = int(np.searchsorted(self.years, start_year, side="left"))
+        hi = int(np.searchsorted(self.years, end_year, side="right"))
+        return slice(lo, max(lo, hi))
+
+    def row_of(self, year):
+        """Return the row position of ``year``, or None if it is not present."""
+        pos = int(np.searchsorted(self.years, year))
+        if pos < len(self.years) and self.years[pos] == year:
+            return pos
+        return None
+
+    def columns_for(self, names):
+        """Return column positions for ``names`` in cube (code) order."""
+        return sorted(pos for name in set(names) for pos in self._by_name.get(name, ()))
+
+    def long_frame(self, rows, cols):
+        """Return the selected cells as a long frame for plotting, NaNs dropped."""
+        block = self.values[rows][:, cols]
+        years = self.years[rows]
+        frame = pd.DataFrame({
+            "refPeriod": np.tile(years, len(cols)),
+            "Indicator Name": np.repeat([self.names[c] for c in cols], len(years)),
+            "Value_Billions": block.T.reshape(-1),
+        })
+        return frame[frame["Value_Billions"].notna()].reset_index(drop=True)
+
+
+def build_cube(df):
+    wide = df.pivot_table(
+        index="refPeriod",
+        columns="Indicator Code",
+        values="Value",
+        aggfunc="first",
+        observed=True,
+    ).sort_index()
+    codes = [str(code) for code in wide.columns]
+    code_to_name = (
+        df[["Indicator Code", "Indicator Name"]]
+        .drop_duplicates("Indicator Code")
+        .set_index("Indicator Code")["Indicator Name"]
+    )
+    names = [str(code_to_name[code]) for code in wide.columns]
+    # Scale from the float64 source column rather than the float32 display one.
+    values = wide.to_numpy(dtype=np.float64) / 1e9
+    return DebtCube(wide.index.to_numpy(), codes, names, values)
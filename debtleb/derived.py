@@ -0,0 +1,155 @@
+"""Derived indicators defined as arithmetic over indicator codes.
+
+``DERIVED_INDICATORS`` maps a code to a display name and an expression
+such as ``100 * DT.DOD.DECT.CD / NY.GNP.MKTP.CD``. Expressions may use
+``+ - * /``, unary minus, numbers and parentheses. When the code is one the
+World Bank also publishes, published values are kept and the expression
+only fills the years it leaves empty.
+
+``derive`` gathers every operand column of a cube once and evaluates all
+expressions over whole year columns, returning a ``DebtCube`` of the
+derived series. Operands are in the source units (US$), not the cube's
+billions, so results are in the indicator's own units, e.g. percent.
+Given the previous result and the store's change record, only the
+expressions reading a changed indicator are re-evaluated, and only for
+the changed years.
+"""
+import ast
+import re
+import threading
+from functools import lru_cache
+
+import numpy as np
+
+from debtleb.cube import DebtCube
+
+DERIVED_INDICATORS = {
+    "DT.DOD.DECT.GN.ZS": ("External debt stocks (% of GNI)", "100 * DT.DOD.DECT.CD / NY.GNP.MKTP.CD"),
+    "DT.DOD.DSTC.ZS": ("Short-term debt (% of total external debt)", "100 * DT.DOD.DSTC.CD / DT.DOD.DECT.CD"),
+    "FI.RES.TOTL.DT.ZS": ("Total reserves (% of total external debt)", "100 * FI.RES.TOTL.CD / DT.DOD.DECT.CD"),
+    "DT.DOD.DSTC.IR.ZS": ("Short-term debt (% of international reserves)", "100 * DT.DOD.DSTC.CD / FI.RES.TOTL.CD"),
+    "DT.TDS.DECT.GN.ZS": ("Total debt service (% of GNI)", "100 * DT.TDS.DECT.CD / NY.GNP.MKTP.CD"),
+    "DX.DOD.DPPG.ZS": (
+        "Public and publicly guaranteed debt (% of total external debt)", "100 * DT.DOD.DPPG.CD / DT.DOD.DECT.CD"
+    ),
+}
+
+# Source values are scaled to billions in the cube.
+CUBE_SCALE = 1e9
+
+_CODE = re.compile(r"\b[A-Z][A-Z0-9]*(?:\.[A-Z0-9]+)+\b")
+_BINARY = {ast.Add: np.add, ast.Sub: np.subtract, ast.Mult: np.multiply, ast.Div: np.divide}
+
+
+@lru_cache(maxsize=None)
+def compile_expression(expression):
+    """Return ``(codes, tree)`` for ``expression``; raise ValueError if it is not plain arithmetic."""
+    codes = []
+
+    def operand(match):
+        if match.group(0) not in codes:
+            codes.append(match.group(0))
+        return f"_{codes.index(match.group(0))}"
+
+    try:
+        tree = ast.parse(_CODE.sub(operand, expression), mode="eval").body
+    except SyntaxError as e:
+        raise ValueError(f"Invalid derived indicator expression {expression!r}") from e
+    for node in ast.walk(tree):
+        allowed = (
+            (isinstance(node, ast.BinOp) and type(node.op) in _BINARY)
+            or (isinstance(node, ast.UnaryOp) and isinstance(node.op, (ast.USub, ast.UAdd)))
+            or (isinstance(node, ast.Constant) and isinstance(node.value, (int, float)))
+            or (isinstance(node, ast.Name) and re.fullmatch(r"_\d+", node.id))
+            or isinstance(node, (ast.operator, ast.unaryop, ast.Load))
+        )
+        if not allowed:
+            raise ValueError(f"Unsupported syntax in derived indicator expression {expression!r}")
+    return tuple(codes), tree
+
+
+def _evaluate(node, operands):
+    if isinstance(node, ast.BinOp):
+        return _BINARY[type(node.op)](_evaluate(node.left, operands), _evaluate(node.right, operands))
+    if isinstance(node, ast.UnaryOp):
+        value = _evaluate(node.operand, operands)
+        return -value if isinstance(node.op, ast.USub) else value
+    if isinstance(node, ast.Constant):
+        return float(node.value)
+    return operands[int(node.id[1:])]
+
+
+def _evaluate_block(cube, codes, compiled, rows, cols, values):
+    """Fill ``values[rows, cols]`` from ``cube``, with one gather of every operand column."""
+    if len(rows) == 0 or not cols:
+        return
+    position = {code: pos for pos, code in enumerate(cube.codes)}
+    needed = sorted({code for i in cols for code in (codes[i], *compiled[codes[i]][0])})
+    gathered = np.full((len(rows), len(needed)), np.nan)
+    present = [j for j, code in enumerate(needed) if code in position]
+    if present:
+        gathered[:, present] = cube.values[rows][:, [position[needed[j]] for j in present]] * CUBE_SCALE
+    column = {code: gathered[:, j] for j, code in enumerate(needed)}
+
+    with np.errstate(divide="ignore", invalid="ignore"):
+        for i in cols:
+            operand_codes, tree = compiled[codes[i]]
+            result = np.broadcast_to(_evaluate(tree, [column[code] for code in operand_codes]), (len(rows),))
+            result = np.where(np.isfinite(result), result, np.nan)
+            published = column[codes[i]]
+            values[rows, i] = np.where(np.isnan(published), result, published)
+
+
+def derive(cube, registry=DERIVED_INDICATORS, previous=None, changes=None):
+    """Evaluate ``registry`` over ``cube``; see the module docstring.
+
+    ``previous`` is the result for the version ``changes`` was diffed
+    against; without both every expression is evaluated for every year.
+    """
+    compiled = {code: compile_expression(expression) for code, (_, expression) in registry.items()}
+    codes = list(registry)
+    names = [name for name, _ in registry.values()]
+    n_years = len(cube.years)
+    values = np.full((n_years, len(codes)), np.nan)
+    all_cols = list(range(len(codes)))
+
+    if previous is None or changes is None or previous.codes != codes:
+        _evaluate_block(cube, codes, compiled, np.arange(n_years), all_cols, values)
+        return DebtCube(cube.years, codes, names, values)
+
+    # Carry previous results over by year. Years it did not have get every
+    # expression; changed years only those reading a changed indicator.
+    known = np.isin(cube.years, previous.years)
+    values[known] = previous.values[np.searchsorted(previous.years, cube.years[known])]
+    _evaluate_block(cube, codes, compiled, np.flatnonzero(~known), all_cols, values)
+    changed = set(changes["indicators"])
+    affected = [i for i, code in enumerate(codes) if code in changed or changed.intersection(compiled[code][0])]
+    rows = np.flatnonzero(known & np.isin(cube.years, list(changes["years"])))
+    _evaluate_block(cube, codes, compiled, rows, affected, values)
+    return DebtCube(cube.years, codes, names, values)
+
+
+class DerivedCache:
+    """The latest derived cube of one country, updated incrementally between versions."""
+
+    def __init__(self, registry=DERIVED_INDICATORS):
+        self.registry = registry
+        self.version = None
+        self.derived = None
+        self.full_builds = 0
+        self.incremental_builds = 0
+        self._lock = threading.Lock()
+
+    def get(self, cube, version, changes=None):
+        with self._lock:
+            if version == self.version and self.derived is not None:
+                return self.derived
+            previous = self.derived
+            if changes is not None and previous is not None and changes.get("base_version") == self.version:
+                self.incremental_builds += 1
+            else:
+                previous = changes = None
+                self.full_builds += 1
+            self.derived = derive(cube, self.registry, previous, changes)
+            self.version = version
+            return self.derived
@@ -0,0 +1,54 @@
+"""Shape-preserving downsampling for charts with many points.
+
+``lttb`` implements Largest-Triangle-Three-Buckets (Steinarsson, 2013): the
+first and last points are kept, the rest are split into equal buckets and
+from each bucket the point forming the largest triangle with the point
+kept before it and the mean of the next bucket is kept. Peaks and troughs
+survive, which plain striding or averaging would flatten.
+"""
+import numpy as np
+
+
+def lttb(x, y, threshold):
+    """Return the sorted positions of at most ``threshold`` points of ``(x, y)`` to keep."""
+    x = np.asarray(x, dtype=np.float64)
+    y = np.asarray(y, dtype=np.float64)
+    n = len(x)
+    if threshold >= n or threshold < 3:
+        return np.arange(n)
+
+    # Bucket i covers [edges[i], edges[i + 1]); the first and last points
+    # sit outside the buckets. Edges are floor(i * (n - 2) / (threshold - 2))
+    # in integers, as a float step can round an edge down by one point.
+    edges = np.arange(threshold - 1, dtype=np.int64) * (n - 2) // (threshold - 2) + 1
+    # Bucket means from prefix sums; the last point stands in for the
+    # bucket after the final one.
+    cx = np.concatenate([[0.0], np.cumsum(x)])
+    cy = np.concatenate([[0.0], np.cumsum(y)])
+    counts = np.diff(edges)
+    mean_x = np.append((cx[edges[1:]] - cx[edges[:-1]]) / counts, x[-1])
+    mean_y = np.append((cy[edges[1:]] - cy[edges[:-1]]) / counts, y[-1])
+
+    keep = np.empty(threshold, dtype=np.intp)
+    keep[0], keep[-1] = 0, n - 1
+    a = 0
+    for i in range(threshold - 2):
+        lo, hi = edges[i], edges[i + 1]
+        area = np.abs(
+            (x[a] - mean_x[i + 1]) * (y[lo:hi] - y[a])
+            - (x[a] - x[lo:hi]) * (mean_y[i + 1] - y[a])
+        )
+        a = lo + int(area.argmax())
+        keep[i + 1] = a
+    return keep
+
+
+def downsample_frame(frame, x, y, series, points_per_series):
+    """Apply ``lttb`` to each ``series`` group of a long frame sorted by ``x`` within groups."""
+    parts = []
+    for _, group in frame.groupby(series, observed=True, sort=False):
+        group = group.sort_values(x)
+        parts.append(group.iloc[lttb(group[x].to_numpy(), group[y].to_numpy(), points_per_series)])
+    if not parts:
+        return frame
+    return frame.loc[np.concatenate([part.index.to_numpy() for part in parts])]
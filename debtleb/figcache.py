@@ -0,0 +1,107 @@
+"""Bounded LRU cache for built Plotly figures.
+
+The dashboard only has a handful of predefined periods and about sixty
+years, so most reruns ask for a figure that has already been built. Figures
+are kept per selection key and handed to ``st.plotly_chart`` as-is; the
+least recently used entry is dropped once ``maxsize`` is reached. When
+``size_of`` is given, each figure's serialized size is measured once, when
+it is built, and reported by ``payload_bytes``.
+"""
+import threading
+from collections import OrderedDict
+
+
+class FigureCache:
+    def __init__(self, maxsize=128, size_of=None):
+        self.maxsize = maxsize
+        self.size_of = size_of
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.invalidations = 0
+        # Content version of the data the cached figures were built from.
+        self.version = None
+        self._entries = OrderedDict()
+        self._sizes = {}
+        # One cache is shared by every session's script thread.
+        self._lock = threading.Lock()
+
+    def __len__(self):
+        return len(self._entries)
+
+    def get_or_build(self, key, build, version=None):
+        """Return the figure cached under ``key``, calling ``build()`` on a miss.
+
+        ``version`` is the data version ``build`` reads, which can lag the
+        cache's when a fragment reruns on data from an earlier full run. A
+        caller on any other version than the cache's bypasses it: the
+        figure is built and returned, but not cached.
+        """
+        with self._lock:
+            if version is None:
+                version = self.version
+            if version == self.version and key in self._entries:
+                self._entries.move_to_end(key)
+                self.hits += 1
+                return self._entries[key]
+            self.misses += 1
+
+        figure = build()
+        size = self.size_of(figure) if self.size_of is not None else None
+
+        with self._lock:
+            if version != self.version:
+                # Built from other data than the cache's, or the data moved
+                # on while building; do not cache a stale figure.
+                return figure
+            self._entries[key] = figure
+            self._entries.move_to_end(key)
+            if size is not None:
+                self._sizes[key] = size
+            while len(self._entries) > self.maxsize:
+                evicted, _ = self._entries.popitem(last=False)
+                self._sizes.pop(evicted, None)
+                self.evictions += 1
+        return figure
+
+    def payload_bytes(self, key):
+        """Return the measured size of the figure cached under ``key``, if known."""
+        with self._lock:
+            return self._sizes.get(key)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self._sizes.clear()
+
+    def advance(self, version, changes=None, touches=None):
+        """Move the cache to data ``version``.
+
+        When ``changes`` was diffed against the cache's current version,
+        only keys for which ``touches(key, changes)`` is true are dropped;
+        otherwise the cache is cleared.
+        """
+        with self._lock:
+            if version == self.version:
+                return
+            if self.version is not None:
+                if changes is not None and touches is not None and changes.get("base_version") == self.version:
+                    stale = [key for key in self._entries if touches(key, changes)]
+                else:
+                    stale = list(self._entries)
+                for key in stale:
+                    del self._entries[key]
+                    self._sizes.pop(key, None)
+                self.invalidations += len(stale)
+            self.version = version
+
+    def stats(self):
+        with self._lock:
+            return {
+                "size": len(self._entries),
+                "maxsize": self.maxsize,
+                "hits": self.hits,
+                "misses": self.misses,
+                "evictions": self.evictions,
+                "invalidations": self.invalidations,
+            }
@@ -0,0 +1,142 @@
+"""Indicator names, periods and debt categories used by the dashboard.
+
+Kept free of Streamlit and Plotly so batch jobs, benchmarks and tests can
+share the dashboard's definitions without loading the UI stack.
+"""
+
+INDICATOR_NAMES = {
+    # External Sector
+    "BM.GSR.TOTL.CD": "Balance of payments, current account, goods, services and primary income (BoP, US$)",
+    "BN.CAB.XOKA.CD": "Current account balance (BoP, US$)",
+    "BX.GSR.TOTL.CD": "Exports of goods and services (BoP, US$)",
+    "BX.TRF.PWKR.CD.DT": "Personal remittances, received (US$)",
+    # FDI & Portfolio
+    "BX.KLT.DINV.CD.WD": "Foreign direct investment, net inflows (US$)",
+    "BX.PEF.TOTL.CD.WD": "Portfolio equity, net inflows (US$)",
+    # Debt Indicators
+    "DT.DOD.DECT.CD": "External debt stocks, total (US$)",
+    "DT.DOD.DECT.GN.ZS": "External debt stocks (% of GNI)",
+    "DT.DOD.DIMF.CD": "Use of IMF credit (US$)",
+    "DT.DOD.DLXF.CD": "Long-term external debt (US$)",
+    "DT.DOD.DPNG.CD": "Multilateral debt (US$)",
+    "DT.DOD.DPPG.CD": "Public and publicly guaranteed debt (US$)",
+    "DT.DOD.DSTC.CD": "Short-term debt (US$)",
+    "DT.DOD.DSTC.ZS": "Short-term debt (% of total external debt)",
+    "DT.DOD.DSTC.XP.ZS": "Short-term debt (% of exports)",
+    "DT.DOD.DSTC.IR.ZS": "Short-term debt (% of international reserves)",
+    "DT.DOD.MIBR.CD": "IBRD loans and IDA credits (US$)",
+    "DT.DOD.MIDA.CD": "IDA total (US$)",
+    "DT.DOD.MWBG.CD": "World Bank debt outstanding (US$)",
+    "DT.DOD.PVLX.CD": "Present value of external debt (US$)",
+    "DT.DOD.PVLX.EX.ZS": "Present value of external debt (% of exports of goods and services)",
+    # Debt Service
+    "DT.TDS.DIMF.CD": "Debt service paid to IMF (US$)",
+    "DT.TDS.DPPF.XP.ZS": "Public and publicly guaranteed debt service (% of exports)",
+    "DT.TDS.DPPG.CD": "Public and publicly guaranteed debt service (US$)",
+    "DT.TDS.DPPG.GN.ZS": "Public and publicly guaranteed debt service (% of GNI)",
+    "DT.TDS.DPPG.XP.ZS": "Public and publicly guaranteed debt service (% of exports)",
+    "DT.TDS.MLAT.CD": "Multilateral debt service (US$)",
+    "DT.TDS.MLAT.PG.ZS": "Multilateral debt service (% of government revenue)",
+    "DT.TDS.DECT.CD": "Total debt service, external (US$)",
+    "DT.TDS.DECT.EX.ZS": "Total debt service (% of exports of goods and services)",
+    "DT.TDS.DECT.GN.ZS": "Total debt service (% of GNI)",
+    # Debt Liabilities
+    "DT.NFL.BLAT.CD": "Debt liabilities, total (US$)",
+    "DT.NFL.BOND.CD": "Bond debt, total (US$)",
+    "DT.NFL.DPNG.CD": "Multilateral debt liabilities (US$)",
+    "DT.NFL.IMFN.CD": "IMF debt liabilities (US$)",
+    "DT.NFL.MIBR.CD": "IBRD loans (US$)",
+    "DT.NFL.MIDA.CD": "IDA credits (US$)",
+    "DT.NFL.MLAT.CD": "Multilateral debt liabilities (US$)",
+    "DT.NFL.MOTH.CD": "Other debt liabilities (US$)",
+    "DT.NFL.NIFC.CD": "Not included in foreign currency debt (US$)",
+    "DT.NFL.OFFT.CD": "Official creditors (US$)",
+    "DT.NFL.PBND.CD": "Public bonds (US$)",
+    "DT.NFL.PCBK.CD": "Public commercial bank debt (US$)",
+    "DT.NFL.PCBO.CD": "Other public bank debt (US$)",
+    "DT.NFL.PROP.CD": "Private sector debt, other (US$)",
+    "DT.NFL.PRVT.CD": "Private debt (US$)",
+    "DT.NFL.PNGB.CD": "Private non-guaranteed bonds (US$)",
+    "DT.NFL.PNGC.CD": "Private non-guaranteed commercial debt (US$)",
+    # Grants / ODA
+    "BX.GRT.EXTA.CD.WD": "Grants (excluding technical cooperation, US$)",
+    "BX.GRT.TECH.CD.WD": "Grants (technical cooperation, US$)",
+    "DT.ODA.ODAT.CD": "Official Development Assistance, total (US$)",
+    "DT.ODA.ODAT.GN.ZS": "Official Development Assistance (% of GNI)",
+    "DT.ODA.ODAT.PC.ZS": "Official Development Assistance per capita (US$)",
+    # Financial / Reserves
+    "FI.RES.TOTL.DT.ZS": "Total reserves (% of total external debt)",
+    "FI.RES.TOTL.MO": "Total reserves in months of imports",
+    "FI.RES.TOTL.CD": "Total reserves (US$)",
+    # GNP
+    "NY.GNP.MKTP.CD": "Gross National Product (current US$)"
+}
+
+TOTAL_DEBT_INDICATOR = "External debt stocks, total (US$)"
+
+# Predefined periods with economic context; the radio also offers a custom
+# range.
+PERIODS = {
+    "🏛️ Post-2019 Crisis (2019-2023)": (2019, 2023),
+    "💰 Pre-Crisis Stability (2010-2018)": (2010, 2018),
+    "🌍 Global Financial Crisis Impact (2007-2012)": (2007, 2012),
+    "📈 Economic Growth Era (2000-2008)": (2000, 2008),
+    "🏗️ Post-War Reconstruction (1990-2000)": (1990, 2000),
+}
+CUSTOM_PERIOD = "🔍 Custom Period"
+
+# What was happening in Lebanon during each predefined period.
+LEBANON_PERIOD_CONTEXT = {
+    "🏛️ Post-2019 Crisis (2019-2023)": (
+        "💥", "Banking crisis, currency collapse, economic meltdown, political instability"
+    ),
+    "💰 Pre-Crisis Stability (2010-2018)": (
+        "💰", "Relative stability, high public debt, banking sector confidence before 2019 crisis"
+    ),
+    "🌍 Global Financial Crisis Impact (2007-2012)": (
+        "🌍", "Resilience during global crisis, continued borrowing, pre-crisis confidence"
+    ),
+    "📈 Economic Growth Era (2000-2008)": (
+        "📈", "Post-war reconstruction completion, economic growth, increased foreign investment"
+    ),
+    "🏗️ Post-War Reconstruction (1990-2000)": (
+        "🏗️", "Massive reconstruction spending, Solidere project, rapid debt accumulation"
+    ),
+}
+
+KEY_DEBT_INDICATORS = [
+    TOTAL_DEBT_INDICATOR,
+    "Long-term external debt (US$)",
+    "Short-term debt (US$)",
+]
+
+# Years the composition selector offers.
+COMPOSITION_YEARS = (1960, 2022)
+
+# Key debt indicators for composition
+DEBT_COMPOSITION_INDICATORS = [
+    TOTAL_DEBT_INDICATOR,
+    "Multilateral debt (US$)",
+    "Public and publicly guaranteed debt (US$)",
+    "World Bank debt outstanding (US$)",
+    "Public commercial bank debt (US$)",
+    "Other public bank debt (US$)",
+    "Private sector debt, other (US$)",
+    "Private debt (US$)",
+    "Private non-guaranteed commercial debt (US$)",
+]
+
+# Public vs private debt categories
+PUBLIC_DEBT_CATEGORIES = [
+    "Public and publicly guaranteed debt (US$)",
+    "Multilateral debt (US$)",
+    "World Bank debt outstanding (US$)",
+    "Public commercial bank debt (US$)",
+    "Other public bank debt (US$)",
+]
+
+PRIVATE_DEBT_CATEGORIES = [
+    "Private debt (US$)",
+    "Private sector debt, other (US$)",
+    "Private non-guaranteed commercial debt (US$)",
+]
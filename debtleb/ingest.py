@@ -0,0 +1,40 @@
+"""Typed, column-pruned ingest of World Bank IDS exports.
+
+Only the columns the dashboard reads are parsed. Indicator codes and names
+are stored as categoricals, years as int16 and the derived billions column
+as float32. Processed frames are partitioned by country into the store
+(see ``debtleb.store``), so the export is only parsed when it changes.
+"""
+import pandas as pd
+
+# Columns of the IDS export the dashboard actually uses. refArea, Observation
+# URI, references, publisher and dataset repeat long URIs on every row.
+USECOLS = ["Indicator Code", "Value", "refPeriod"]
+
+CSV_DTYPES = {
+    "refArea": "category",
+    "Indicator Code": "category",
+    "Value": "float64",
+    "refPeriod": "int16",
+}
+
+def read_export(csv_path, with_country=False):
+    usecols = ["refArea", *USECOLS] if with_country else USECOLS
+    dtypes = {column: CSV_DTYPES[column] for column in usecols}
+    return pd.read_csv(csv_path, usecols=usecols, dtype=dtypes)
+
+
+def process_export(raw):
+    df = raw.reset_index(drop=True)
+    df["Value_Billions"] = (df["Value"] / 1e9).astype("float32")
+    return df
+
+
+def attach_names(df, indicator_names):
+    # Names are mapped per category, not per row, and kept out of the store
+    # so edits to the mapping never require rebuilding it.
+    labels = {code: indicator_names.get(code, code) for code in df["Indicator Code"].cat.categories}
+    df = df.copy(deep=False)
+    df["Indicator Name"] = df["Indicator Code"].map(labels).astype("category")
+    return df[["Indicator Code", "Indicator Name", "refPeriod", "Value", "Value_Billions"]]
+
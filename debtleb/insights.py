@@ -0,0 +1,164 @@
+"""Insight payloads for every dashboard selection, computed when data loads.
+
+The period insight box, the period context and the composition cards read
+one small dict per selection. For a period, that is peak and lowest total
+debt, the range between them, the years with data and the country context.
+For a year, it is the total, the largest component and the public/private
+shares. ``build_insights`` computes the payloads of every predefined
+period and every composition year in one batch over the cube.
+``Insights`` serves them by selection. Custom ranges are computed on
+demand into the same object, which keeps the ``maxsize`` most recently
+used. Values are plain Python numbers, so the UI only formats them and
+reports write them as JSON unchanged.
+"""
+import threading
+from collections import OrderedDict
+
+import numpy as np
+
+from debtleb.indicators import (
+    COMPOSITION_YEARS, KEY_DEBT_INDICATORS, LEBANON_PERIOD_CONTEXT, PERIODS, TOTAL_DEBT_INDICATOR,
+)
+
+
+def period_insights(cube, ranges, context=None):
+    """Return one payload per ``(label, (start_year, end_year))`` of ``ranges``."""
+    years = cube.years
+    positions = np.arange(len(years))
+    # Prefix count of years with any key indicator reported.
+    key_block = cube.values[:, cube.columns_for(KEY_DEBT_INDICATORS)]
+    with_data = np.concatenate([[0], np.cumsum(~np.isnan(key_block).all(axis=1))])
+    total_cols = cube.columns_for([TOTAL_DEBT_INDICATOR])
+    totals = cube.values[:, total_cols[0]] if total_cols else np.full(len(years), np.nan)
+
+    bounds = np.asarray([year_range for _, year_range in ranges], dtype=np.int64).reshape(-1, 2)
+    lo = np.searchsorted(years, bounds[:, 0], side="left")
+    hi = np.maximum(lo, np.searchsorted(years, bounds[:, 1], side="right"))
+    # One row per range: which years it covers with a reported total.
+    inside = (positions >= lo[:, None]) & (positions < hi[:, None]) & np.isfinite(totals)
+    reported = inside.any(axis=1)
+    peak = np.where(inside, totals, -np.inf).argmax(axis=1)
+    low = np.where(inside, totals, np.inf).argmin(axis=1)
+
+    payloads = []
+    for i, (label, (start_year, end_year)) in enumerate(ranges):
+        payload = {
+            "label": label,
+            "name": label.split(" ", 1)[-1],
+            "start_year": int(start_year),
+            "end_year": int(end_year),
+            "duration": int(end_year - start_year + 1),
+            "years_with_data": int(with_data[hi[i]] - with_data[lo[i]]),
+            "context": (context or {}).get(label),
+            "peak_year": None, "peak_billions": None,
+            "lowest_year": None, "lowest_billions": None,
+            "range_billions": None,
+        }
+        if reported[i]:
+            payload.update(
+                peak_year=int(years[peak[i]]), peak_billions=float(totals[peak[i]]),
+                lowest_year=int(years[low[i]]), lowest_billions=float(totals[low[i]]),
+                range_billions=float(totals[peak[i]] - totals[low[i]]),
+            )
+        payloads.append(payload)
+    return payloads
+
+
+def composition_insights(table, years):
+    """Return ``{year: payload}`` for ``years`` of a ``CompositionTable``."""
+    splits = [table.split(year) for year in years]
+    total = np.asarray([split["total"] for split in splits], dtype=np.float64)
+    largest = np.asarray([split["largest_value"] for split in splits], dtype=np.float64)
+    with np.errstate(invalid="ignore", divide="ignore"):
+        largest_pct = np.where(total > 0, largest / total * 100, np.nan)
+
+    payloads = {}
+    for i, (year, split) in enumerate(zip(years, splits)):
+        available = bool(split["cols"])
+        payloads[int(year)] = {
+            "year": int(year),
+            "indicators": len(split["cols"]),
+            "total_billions": float(total[i]),
+            "largest_name": split["largest_name"] if available else None,
+            "largest_billions": float(largest[i]) if available else None,
+            "largest_pct": float(largest_pct[i]) if available else None,
+            "public_billions": float(split["public"]),
+            "private_billions": float(split["private"]),
+            "public_pct": float(split["public_pct"]),
+            "private_pct": float(split["private_pct"]),
+        }
+    return payloads
+
+
+class Insights:
+    """Insight payloads of one data version, keyed by selection."""
+
+    def __init__(self, cube, table, periods, compositions, context=None, maxsize=64):
+        self.cube = cube
+        self.table = table
+        self.context = context
+        self.maxsize = maxsize
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self._fixed = {("period", payload["label"]): payload for payload in periods}
+        self._fixed.update((("composition", year), payload) for year, payload in compositions.items())
+        self._on_demand = OrderedDict()
+        # One object is shared by every session's script thread.
+        self._lock = threading.Lock()
+
+    def period(self, label, year_range):
+        """Return the payload of period ``label``; custom ranges are filled on demand."""
+        start_year, end_year = int(year_range[0]), int(year_range[1])
+        payload = self._fixed.get(("period", label))
+        if payload is not None and (payload["start_year"], payload["end_year"]) == (start_year, end_year):
+            return payload
+        return self._get_or_build(
+            ("period", label, start_year, end_year),
+            lambda: period_insights(self.cube, [(label, (start_year, end_year))], self.context)[0],
+        )
+
+    def composition(self, year):
+        """Return the composition payload of ``year``."""
+        payload = self._fixed.get(("composition", int(year)))
+        if payload is not None:
+            return payload
+        return self._get_or_build(("composition", int(year)), lambda: composition_insights(self.table, [year])[int(year)])
+
+    def _get_or_build(self, key, build):
+        with self._lock:
+            if key in self._on_demand:
+                self._on_demand.move_to_end(key)
+                self.hits += 1
+                return self._on_demand[key]
+            self.misses += 1
+        payload = build()
+        with self._lock:
+            self._on_demand[key] = payload
+            while len(self._on_demand) > self.maxsize:
+                self._on_demand.popitem(last=False)
+                self.evictions += 1
+        return payload
+
+    def stats(self):
+        with self._lock:
+            return {
+                "precomputed": len(self._fixed),
+                "size": len(self._on_demand),
+                "maxsize": self.maxsize,
+                "hits": self.hits,
+                "misses": self.misses,
+                "evictions": self.evictions,
+            }
+
+
+def build_insights(cube, table, country, maxsize=64):
+    """Compute every predefined period and composition year of ``cube`` for ``country``."""
+    context = LEBANON_PERIOD_CONTEXT if country == "Lebanon" else None
+    years = [int(year) for year in cube.years if COMPOSITION_YEARS[0] <= year <= COMPOSITION_YEARS[1]]
+    return Insights(
+        cube, table,
+        period_insights(cube, list(PERIODS.items()), context),
+        composition_insights(table, years),
+        context, maxsize,
+    )
@@ -0,0 +1,77 @@
+"""Per-rerun timing of the dashboard's named sections.
+
+Each unit of the page that Streamlit can rerun on its own (the page body
+and every fragment) gets a ``RenderTimings``. Sections are timed with
+``perf_counter``, cache lookups are recorded as hits or misses and sizes
+are recorded for what is sent to the browser. ``finish()`` writes one JSON
+line to the ``debtleb.perf`` logger so production reruns can be
+aggregated without attaching a profiler.
+"""
+import json
+import logging
+import time
+from contextlib import contextmanager
+
+logger = logging.getLogger("debtleb.perf")
+
+
+class RenderTimings:
+    def __init__(self, unit, **context):
+        self.unit = unit
+        self.context = context
+        self.sections = {}
+        self.caches = {}
+        self.payloads = {}
+        self._started = time.perf_counter()
+
+    @contextmanager
+    def section(self, name):
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            # A section entered more than once in a rerun accumulates.
+            self.sections[name] = self.sections.get(name, 0.0) + (time.perf_counter() - start) * 1000
+
+    def cache(self, name, hit):
+        self.caches[name] = "hit" if hit else "miss"
+
+    def cached(self, name, build):
+        """Record ``name`` as a hit unless the returned wrapper of ``build`` is called."""
+        self.cache(name, True)
+
+        def wrapper(*args, **kwargs):
+            self.cache(name, False)
+            return build(*args, **kwargs)
+        return wrapper
+
+    def payload(self, name, nbytes):
+        if nbytes is not None:
+            self.payloads[name] = int(nbytes)
+
+    def record(self):
+        return {
+            "event": "render",
+            "unit": self.unit,
+            **self.context,
+            "total_ms": round((time.perf_counter() - self._started) * 1000, 3),
+            "sections_ms": {name: round(ms, 3) for name, ms in self.sections.items()},
+            "caches": dict(self.caches),
+            "payload_bytes": dict(self.payloads),
+        }
+
+    def finish(self):
+        record = self.record()
+        if logger.isEnabledFor(logging.INFO):
+            logger.info(json.dumps(record, default=str))
+        return record
+
+
+def enable_log(stream=None):
+    """Send ``debtleb.perf`` records to ``stream`` (stderr by default) at INFO."""
+    if not any(getattr(handler, "_debtleb", False) for handler in logger.handlers):
+        handler = logging.StreamHandler(stream)
+        handler.setFormatter(logging.Formatter("%(asctime)s %(name)s %(message)s"))
+        handler._debtleb = True
+        logger.addHandler(handler)
+    logger.setLevel(logging.INFO)
@@ -0,0 +1,114 @@
+"""Constant-time range statistics over a DebtCube.
+
+Per indicator, prefix counts, sums and sums of squares are laid out over the
+contiguous year span of the cube, together with the nearest observed row on
+either side of every year. Average, volatility (sample standard deviation),
+first/last observed value, total growth and CAGR for any
+``(start_year, end_year)`` then cost a handful of array lookups, independent
+of the range length.
+"""
+import numpy as np
+import pandas as pd
+
+STAT_COLUMNS = [
+    "indicator", "observations", "average", "volatility",
+    "start_value", "end_value", "total_growth", "annual_growth",
+]
+
+
+class RangeIndex:
+    def __init__(self, first_year, names, values, count, total, total_sq, shift, next_valid, prev_valid):
+        self.first_year = first_year
+        self.names = names
+        self.values = values
+        self.count = count
+        self.total = total
+        self.total_sq = total_sq
+        self.shift = shift
+        self.next_valid = next_valid
+        self.prev_valid = prev_valid
+
+    @property
+    def last_year(self):
+        return self.first_year + len(self.values) - 1
+
+
+def build_range_index(cube):
+    if cube.empty:
+        first_year = 0
+        values = np.empty((0, len(cube.names)))
+    else:
+        # Spread the cube over every calendar year so a year maps to a row
+        # by subtraction; years without observations stay NaN.
+        first_year = int(cube.years[0])
+        span = int(cube.years[-1]) - first_year + 1
+        values = np.full((span, len(cube.names)), np.nan)
+        values[cube.years - first_year] = cube.values
+
+    valid = ~np.isnan(values)
+    # Centre each column on its mean before accumulating so the
+    # sum-of-squares variance formula does not lose precision.
+    with np.errstate(invalid="ignore"):
+        shift = np.nan_to_num(np.nanmean(values, axis=0)) if len(values) else np.zeros(values.shape[1])
+    centred = np.where(valid, values - shift, 0.0)
+
+    n_rows, n_cols = values.shape
+    zeros = np.zeros((1, n_cols))
+    count = np.vstack([zeros, np.cumsum(valid, axis=0)])
+    total = np.vstack([zeros, np.cumsum(centred, axis=0)])
+    total_sq = np.vstack([zeros, np.cumsum(centred * centred, axis=0)])
+
+    rows = np.arange(n_rows)[:, None]
+    prev_valid = np.maximum.accumulate(np.where(valid, rows, -1), axis=0)
+    next_valid = np.minimum.accumulate(np.where(valid, rows, n_rows)[::-1], axis=0)[::-1]
+
+    return RangeIndex(first_year, list(cube.names), values, count, total, total_sq, shift, next_valid, prev_valid)
+
+
+def range_stats(index, start_year, end_year, cols):
+    """Return one row of statistics per column position in ``cols``.
+
+    ``total_growth`` and ``annual_growth`` are percentages between the first
+    and last observed values in the range; CAGR is taken over
+    ``end_year - start_year`` years, as the dashboard has always shown it.
+    """
+    cols = np.asarray(cols, dtype=np.intp)
+    lo = max(int(start_year), index.first_year) - index.first_year
+    hi = min(int(end_year), index.last_year) - index.first_year + 1
+    if hi <= lo or len(cols) == 0:
+        n = np.zeros(len(cols))
+        s = s2 = n
+        first = last = np.full(len(cols), np.nan)
+    else:
+        n = index.count[hi, cols] - index.count[lo, cols]
+        s = index.total[hi, cols] - index.total[lo, cols]
+        s2 = index.total_sq[hi, cols] - index.total_sq[lo, cols]
+        first_row = index.next_valid[lo, cols]
+        last_row = index.prev_valid[hi - 1, cols]
+        has = n > 0
+        first = np.where(has, index.values[np.where(has, first_row, 0), cols], np.nan)
+        last = np.where(has, index.values[np.where(has, last_row, 0), cols], np.nan)
+
+    years = int(end_year) - int(start_year)
+    exponent = 1 / years if years > 0 else 0.0
+    with np.errstate(divide="ignore", invalid="ignore"):
+        average = np.where(n > 0, s / np.maximum(n, 1), np.nan) + index.shift[cols]
+        variance = (s2 - s * s / np.maximum(n, 1)) / (n - 1)
+        volatility = np.where(n > 1, np.sqrt(np.maximum(variance, 0.0)), np.nan)
+        total_growth = np.where((n >= 2) & (first != 0), (last - first) / first * 100, 0.0)
+        annual_growth = np.where(
+            (n >= 2) & (first > 0) & (years > 0),
+            (np.power(last / first, exponent) - 1) * 100,
+            0.0,
+        )
+
+    return pd.DataFrame({
+        "indicator": [index.names[c] for c in cols],
+        "observations": n.astype(np.int64),
+        "average": average,
+        "volatility": volatility,
+        "start_value": first,
+        "end_value": last,
+        "total_growth": total_growth,
+        "annual_growth": annual_growth,
+    }, columns=STAT_COLUMNS)
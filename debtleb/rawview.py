@@ -0,0 +1,48 @@
+"""Filtering, paging and CSV export for the raw data viewer.
+
+Filters resolve to an array of matching row positions so the viewer only
+ever materializes the visible page. Text search runs over the categorical
+code and name dictionaries instead of every row.
+"""
+import numpy as np
+
+PAGE_SIZES = [25, 50, 100, 250]
+
+
+def matching_rows(df, indicators=(), year_range=None, search=""):
+    """Return positions of rows matching every supplied filter."""
+    mask = np.ones(len(df), dtype=bool)
+    if indicators:
+        mask &= df["Indicator Name"].isin(indicators).to_numpy()
+    if year_range is not None:
+        years = df["refPeriod"].to_numpy()
+        mask &= (years >= year_range[0]) & (years <= year_range[1])
+    search = search.strip()
+    if search:
+        hit = np.zeros(len(df), dtype=bool)
+        for column in ("Indicator Code", "Indicator Name"):
+            categories = df[column].cat.categories
+            matched = categories[categories.str.contains(search, case=False, regex=False)]
+            hit |= df[column].isin(matched).to_numpy()
+        mask &= hit
+    return np.flatnonzero(mask)
+
+
+def page_count(n_rows, page_size):
+    return max(1, -(-n_rows // page_size))
+
+
+def page_frame(df, rows, columns, page, page_size):
+    """Return the ``page``-th (1-based) page of ``rows`` restricted to ``columns``."""
+    start = (page - 1) * page_size
+    return df.iloc[rows[start:start + page_size]][columns]
+
+
+def csv_bytes(df, rows, columns):
+    """Return ``rows`` restricted to ``columns`` as one UTF-8 CSV.
+
+    The file is built in full, in memory. The viewer passes this as a
+    callable to ``st.download_button``, so it only runs when the button is
+    clicked.
+    """
+    return df.iloc[rows][columns].to_csv(index=False).encode("utf-8")
@@ -0,0 +1,222 @@
+"""Render every predefined period and composition year to static files.
+
+For each country in a published store, one report is written per entry in
+``PERIODS`` and one per year in ``COMPOSITION_YEARS``: the dashboard figure
+as standalone HTML (and PNG when kaleido is installed) next to a JSON file
+with the statistics the dashboard shows for that view::
+
+    python -m debtleb.reports --store-dir store --out reports --workers 8
+
+Work is spread over a process pool in chunks of one country's views.
+Workers read partitions from the published snapshot (memory-mapped with the
+``arrow`` format) instead of re-parsing the exports, and each worker builds
+a country's cube, range index, composition table and insights once for all
+the views it renders.
+"""
+import argparse
+import importlib.util
+import json
+import math
+import multiprocessing
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from functools import lru_cache
+from pathlib import Path
+
+import numpy as np
+
+from debtleb.charts import build_composition_figure, build_period_figure
+from debtleb.composition import build_composition_table
+from debtleb.cube import build_cube
+from debtleb.indicators import (
+    COMPOSITION_YEARS, DEBT_COMPOSITION_INDICATORS, INDICATOR_NAMES, KEY_DEBT_INDICATORS, PERIODS,
+    PRIVATE_DEBT_CATEGORIES, PUBLIC_DEBT_CATEGORIES,
+)
+from debtleb.insights import build_insights
+from debtleb.rangestats import build_range_index, range_stats
+from debtleb.store import FORMATS, PartitionStore, ensure_store, read_manifest
+
+FIGURE_FORMATS = ("html", "png")
+VIEWS_PER_TASK = 16
+
+_store = None
+_snapshot = None
+
+
+def slug(text):
+    return "".join(ch if ch.isalnum() else "_" for ch in text).strip("_")
+
+
+def plain(value):
+    """Convert NumPy scalars to Python and NaN to None so ``value`` is valid JSON."""
+    if isinstance(value, dict):
+        return {key: plain(item) for key, item in value.items()}
+    if isinstance(value, (list, tuple)):
+        return [plain(item) for item in value]
+    if isinstance(value, np.generic):
+        value = value.item()
+    if isinstance(value, float) and not math.isfinite(value):
+        return None
+    return value
+
+
+def list_views(cube):
+    """Return the dashboard views of ``cube``: every predefined period and composition year."""
+    views = [("period", label, year_range) for label, year_range in PERIODS.items()]
+    views += [
+        ("composition", str(int(year)), int(year))
+        for year in cube.years
+        if COMPOSITION_YEARS[0] <= year <= COMPOSITION_YEARS[1]
+    ]
+    return views
+
+
+def period_report(cube, index, insights, country, label, year_range):
+    rows = cube.rows_between(*year_range)
+    cols = cube.columns_for(KEY_DEBT_INDICATORS)
+    data = cube.long_frame(rows, cols)
+    stats = range_stats(index, year_range[0], year_range[1], cols)
+    payload = {
+        "country": country,
+        "view": "period",
+        "period": label,
+        "start_year": year_range[0],
+        "end_year": year_range[1],
+        "statistics": stats.to_dict("records"),
+        "insights": insights.period(label, year_range),
+    }
+    figure = build_period_figure(data, year_range, country) if not data.empty else None
+    return payload, figure
+
+
+def composition_report(cube, table, insights, country, year):
+    split = table.split(year)
+    components = [
+        {"indicator": cube.names[col], "value_billions": cube.values[split["row"], col]}
+        for col in split["cols"]
+    ]
+    payload = {
+        "country": country,
+        "view": "composition",
+        "year": year,
+        "components": components,
+        "insights": insights.composition(year),
+    }
+    figure = None
+    if components:
+        data = cube.long_frame(slice(split["row"], split["row"] + 1), split["cols"])
+        figure = build_composition_figure(data, year)
+    return payload, figure
+
+
+def _init_worker(store_dir, snapshot):
+    global _store, _snapshot
+    _store = PartitionStore(store_dir, INDICATOR_NAMES)
+    _snapshot = snapshot
+
+
+@lru_cache(maxsize=4)
+def _derived(country):
+    cube = build_cube(_store.get(country))
+    table = build_composition_table(cube, DEBT_COMPOSITION_INDICATORS, PUBLIC_DEBT_CATEGORIES, PRIVATE_DEBT_CATEGORIES)
+    return cube, build_range_index(cube), table, build_insights(cube, table, country)
+
+
+def render_views(country, chunk, out_dir, formats):
+    """Write the ``chunk``-th slice of ``country``'s views under ``out_dir``; return the files written."""
+    if _store.snapshot != _snapshot:
+        raise RuntimeError(f"store was republished during the run ({_snapshot} -> {_store.snapshot})")
+    cube, index, table, insights = _derived(country)
+    views = list_views(cube)[chunk * VIEWS_PER_TASK:(chunk + 1) * VIEWS_PER_TASK]
+    country_dir = Path(out_dir) / slug(country)
+    country_dir.mkdir(parents=True, exist_ok=True)
+
+    written = []
+    for kind, name, selection in views:
+        if kind == "period":
+            payload, figure = period_report(cube, index, insights, country, name, selection)
+            stem = f"period_{selection[0]}-{selection[1]}"
+        else:
+            payload, figure = composition_report(cube, table, insights, country, selection)
+            stem = f"composition_{selection}"
+        files = {"json": country_dir / f"{stem}.json"}
+        files["json"].write_text(json.dumps(plain(payload), indent=2, ensure_ascii=False), encoding="utf-8")
+        if figure is not None:
+            if "html" in formats:
+                files["html"] = country_dir / f"{stem}.html"
+                figure.write_html(files["html"], include_plotlyjs="cdn")
+            if "png" in formats:
+                files["png"] = country_dir / f"{stem}.png"
+                figure.write_image(files["png"])
+        written.append({"country": country, "view": kind, "name": name,
+                        **{fmt: str(path.relative_to(out_dir)) for fmt, path in files.items()}})
+    return written
+
+
+def generate_reports(store_dir, out_dir, countries=None, formats=("html",), workers=None, on_progress=None):
+    """Render every view of ``countries`` (default: all) and write ``index.json``.
+
+    ``on_progress(done, total, views)`` is called as each chunk finishes.
+    """
+    out_dir = Path(out_dir)
+    out_dir.mkdir(parents=True, exist_ok=True)
+    store = PartitionStore(store_dir, INDICATOR_NAMES)
+    countries = countries or store.countries()
+    missing = sorted(set(countries) - set(store.countries()))
+    if missing:
+        raise KeyError(f"No partitions for {', '.join(missing)} in {store_dir}")
+
+    # Every country has at most this many views; workers skip empty chunks,
+    # so nothing is loaded in this process.
+    max_views = len(PERIODS) + COMPOSITION_YEARS[1] - COMPOSITION_YEARS[0] + 1
+    tasks = [(country, chunk) for country in countries for chunk in range(math.ceil(max_views / VIEWS_PER_TASK))]
+
+    written = []
+    # Spawned workers import only the data layer; Plotly loads on the first figure.
+    context = multiprocessing.get_context("spawn")
+    with ProcessPoolExecutor(workers, mp_context=context, initializer=_init_worker,
+                             initargs=(str(store_dir), store.snapshot)) as pool:
+        futures = [pool.submit(render_views, country, chunk, str(out_dir), tuple(formats))
+                   for country, chunk in tasks]
+        for done, future in enumerate(as_completed(futures), 1):
+            written += future.result()
+            if on_progress is not None:
+                on_progress(done, len(futures), len(written))
+
+    written.sort(key=lambda entry: (entry["country"], entry["view"], entry["name"]))
+    index = {"snapshot": store.snapshot, "countries": list(countries), "reports": written}
+    (out_dir / "index.json").write_text(json.dumps(index, indent=2, ensure_ascii=False), encoding="utf-8")
+    return index
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Render every dashboard period and year view to static files.")
+    parser.add_argument("--store-dir", default="store")
+    parser.add_argument("--csv", nargs="+", help="IDS exports to publish into the store first")
+    parser.add_argument("--format", choices=sorted(FORMATS),
+                        help="store format for --csv (default: the store's current format, else parquet)")
+    parser.add_argument("--out", default="reports")
+    parser.add_argument("--countries", nargs="+", help="countries to render (default: all)")
+    parser.add_argument("--formats", nargs="+", choices=FIGURE_FORMATS, default=["html"])
+    parser.add_argument("--workers", type=int, default=os.cpu_count())
+    args = parser.parse_args(argv)
+    if "png" in args.formats and importlib.util.find_spec("kaleido") is None:
+        parser.error("PNG export needs the kaleido package (pip install kaleido)")
+
+    if args.csv:
+        # Republishing in another format would rebuild the whole store.
+        fmt = args.format or (read_manifest(args.store_dir) or {}).get("format", "parquet")
+        ensure_store(args.csv, args.store_dir, fmt)
+    start = time.perf_counter()
+    index = generate_reports(
+        args.store_dir, args.out, args.countries, args.formats, args.workers,
+        on_progress=lambda done, total, views: print(f"\r{done}/{total} chunks, {views} views", end="", flush=True),
+    )
+    print()
+    print(f"Wrote {len(index['reports'])} reports for {len(index['countries'])} countries"
+          f" to {args.out} in {time.perf_counter() - start:.1f}s")
+
+
+if __name__ == "__main__":
+    main()
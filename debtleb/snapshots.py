@@ -0,0 +1,79 @@
+"""Watch a directory of IDS export snapshots and ingest the newest one.
+
+Export files are named ``<id>_<YYYYMMDD>_<HHMMSS>.csv``; the newest is the
+one with the latest time, taken from the name (as local time) or, for
+files that do not follow the pattern, from the modification time. Ingestion goes through
+``ensure_store``, so an unchanged file costs one ``stat`` and a renamed
+or touched one costs a content hash, while a real change rewrites only
+the affected partitions.
+"""
+import logging
+import re
+import threading
+from datetime import datetime
+from pathlib import Path
+
+from debtleb.store import ensure_store
+
+EXPORT_PATTERN = "*.csv"
+DEFAULT_POLL_SECONDS = 60
+_TIMESTAMP = re.compile(r"_(\d{8})_(\d{6})$")
+
+logger = logging.getLogger(__name__)
+
+
+def export_timestamp(path):
+    """Return the export's time in seconds since the epoch."""
+    path = Path(path)
+    match = _TIMESTAMP.search(path.stem)
+    if match:
+        try:
+            return datetime.strptime(match.group(1) + match.group(2), "%Y%m%d%H%M%S").timestamp()
+        except ValueError:  # digits that are not a date
+            pass
+    return path.stat().st_mtime
+
+
+def find_latest_export(directory, pattern=EXPORT_PATTERN):
+    """Return the newest export in ``directory``, or None if there is none."""
+    exports = [path for path in Path(directory).glob(pattern) if path.is_file()]
+    if not exports:
+        return None
+    return max(exports, key=lambda path: (export_timestamp(path), path.name))
+
+
+class SnapshotWatcher:
+    def __init__(self, directory, store_dir, fmt="parquet", interval=DEFAULT_POLL_SECONDS):
+        self.directory = Path(directory)
+        self.store_dir = store_dir
+        self.fmt = fmt
+        self.interval = interval
+        self.last_error = None
+        self._stop = threading.Event()
+        self._thread = None
+
+    def poll(self):
+        """Ingest the newest export if it differs from the store; return the manifest."""
+        latest = find_latest_export(self.directory)
+        if latest is None:
+            return None
+        return ensure_store([latest], self.store_dir, self.fmt)
+
+    def _run(self):
+        while not self._stop.wait(self.interval):
+            try:
+                self.poll()
+                self.last_error = None
+            except Exception as e:  # keep watching; a bad export must not kill the thread
+                logger.exception("Ingesting the newest export in %s failed", self.directory)
+                self.last_error = e
+
+    def start(self):
+        """Poll in a daemon thread so ingestion never runs inside a session's rerun."""
+        if self._thread is None:
+            self._thread = threading.Thread(target=self._run, name="snapshot-watcher", daemon=True)
+            self._thread.start()
+        return self
+
+    def stop(self):
+        self._stop.set()
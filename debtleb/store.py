@@ -0,0 +1,375 @@
+"""Partitioned on-disk store with one partition per reporting country.
+
+``build_store`` splits IDS exports on ``refArea`` and writes each country
+to its own file, sorted by indicator code and year, inside a fresh snapshot
+directory. ``manifest.json`` names the current snapshot, its partitions and
+the exports they came from; it is replaced atomically once the snapshot is
+complete, so readers always see one whole snapshot.
+
+Builds are incremental. Exports whose content hash matches the current
+manifest are not re-ingested. Otherwise each country is compared with its
+previous partition: unchanged partitions are linked into the new snapshot
+and keep their version, and changed ones record which (indicator, year)
+observations moved so caches can invalidate just those selections.
+
+Partitions are Parquet by default. With the ``arrow`` format they are
+uncompressed Arrow IPC files that every server process memory-maps
+read-only, so workers on one host share a single copy in the page cache.
+
+``PartitionStore`` loads a partition the first time it is asked for and
+keeps loaded partitions in LRU order, evicting the least recently used ones
+once their combined in-memory size exceeds the configured budget.
+"""
+import argparse
+import hashlib
+import json
+import os
+import shutil
+import threading
+import time
+from collections import OrderedDict
+from contextlib import contextmanager
+from pathlib import Path
+from urllib.parse import unquote
+
+import pandas as pd
+
+from debtleb.ingest import attach_names, process_export, read_export
+
+try:
+    import fcntl
+except ImportError:  # Windows: builds are not serialized across processes.
+    fcntl = None
+
+MANIFEST_NAME = "manifest.json"
+LOCK_NAME = ".build.lock"
+DEFAULT_MEMORY_BUDGET_MB = 512
+FORMATS = {"parquet": ".parquet", "arrow": ".arrow"}
+# Snapshots kept on disk: the current one and the one before it, which
+# processes that have not refreshed yet may still have mapped.
+KEEP_SNAPSHOTS = 2
+
+
+def country_name(ref_area):
+    """Return the display name for a refArea URI, e.g. ``.../resource/Lebanon``."""
+    return unquote(str(ref_area).rstrip("/").rsplit("/", 1)[-1]).replace("_", " ")
+
+
+def partition_file(country, fmt="parquet"):
+    return "".join(ch if ch.isalnum() else "_" for ch in country) + FORMATS[fmt]
+
+
+def content_hash(path, chunk_size=1 << 20):
+    digest = hashlib.sha256()
+    with open(path, "rb") as fh:
+        for chunk in iter(lambda: fh.read(chunk_size), b""):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def source_signature(csv_paths, with_hash=False):
+    signature = []
+    for path in csv_paths:
+        stat = Path(path).stat()
+        entry = {"path": str(path), "size": stat.st_size, "mtime": stat.st_mtime}
+        if with_hash:
+            entry["sha256"] = content_hash(path)
+        signature.append(entry)
+    return signature
+
+
+def _stat_key(signature):
+    return [(entry["path"], entry["size"], entry["mtime"]) for entry in signature]
+
+
+def partition_version(df):
+    """Return a content hash of a partition's observations."""
+    hashed = pd.util.hash_pandas_object(df[["Indicator Code", "refPeriod", "Value"]], index=False)
+    return hashlib.sha256(hashed.to_numpy().tobytes()).hexdigest()[:16]
+
+
+def changed_observations(old, new):
+    """Return the (indicator code, year) pairs added, removed or revised in ``new``."""
+    keys = ["Indicator Code", "refPeriod"]
+    old = old[keys + ["Value"]].astype({"Indicator Code": str})
+    new = new[keys + ["Value"]].astype({"Indicator Code": str})
+    merged = old.merge(new, on=keys, how="outer", suffixes=("_old", "_new"))
+    same = (merged["Value_old"] == merged["Value_new"]) | (merged["Value_old"].isna() & merged["Value_new"].isna())
+    return merged.loc[~same, keys]
+
+
+def read_manifest(store_dir):
+    try:
+        with open(Path(store_dir) / MANIFEST_NAME, encoding="utf-8") as fh:
+            return json.load(fh)
+    except (OSError, ValueError):
+        return None
+
+
+def write_partition(df, path, fmt="parquet"):
+    if fmt == "arrow":
+        import pyarrow as pa
+        import pyarrow.ipc as ipc
+
+        table = pa.Table.from_pandas(df, preserve_index=False)
+        with pa.OSFile(str(path), "wb") as sink, ipc.new_file(sink, table.schema) as writer:
+            writer.write_table(table)
+    else:
+        df.to_parquet(path, index=False)
+
+
+def read_partition(path, fmt="parquet"):
+    if fmt == "arrow":
+        import pyarrow as pa
+        import pyarrow.ipc as ipc
+
+        # Numeric and dictionary-index buffers stay backed by the mapping.
+        table = ipc.open_file(pa.memory_map(str(path), "r")).read_all()
+        return table.to_pandas(split_blocks=True)
+    return pd.read_parquet(path)
+
+
+def write_manifest(store_dir, manifest):
+    path = Path(store_dir) / MANIFEST_NAME
+    tmp = path.with_name(f"{path.name}.{os.getpid()}.tmp")
+    with open(tmp, "w", encoding="utf-8") as fh:
+        json.dump(manifest, fh, indent=2)
+    os.replace(tmp, path)
+
+
+@contextmanager
+def build_lock(store_dir):
+    """Serialize store builds between processes sharing ``store_dir``."""
+    if fcntl is None:
+        yield
+        return
+    with open(Path(store_dir) / LOCK_NAME, "w") as fh:
+        fcntl.flock(fh, fcntl.LOCK_EX)
+        try:
+            yield
+        finally:
+            fcntl.flock(fh, fcntl.LOCK_UN)
+
+
+def prune_snapshots(store_dir, current):
+    snapshots = sorted(
+        (p for p in Path(store_dir).iterdir() if p.is_dir() and p.name.startswith("snapshot-")),
+        key=lambda p: p.name,
+    )
+    stale = [p for p in snapshots if p.name != current][: max(0, len(snapshots) - KEEP_SNAPSHOTS)]
+    for path in stale:
+        # Unlinking mapped files is safe on POSIX; existing mappings stay valid.
+        shutil.rmtree(path, ignore_errors=True)
+
+
+def link_partition(src, dst):
+    try:
+        os.link(src, dst)
+    except OSError:
+        shutil.copy2(src, dst)
+
+
+def build_store(csv_paths, store_dir, fmt="parquet"):
+    """Partition ``csv_paths`` by country into a new snapshot and return the manifest."""
+    store_dir = Path(store_dir)
+    store_dir.mkdir(parents=True, exist_ok=True)
+    sources = source_signature(csv_paths, with_hash=True)
+    previous = read_manifest(store_dir)
+    if previous is None or previous.get("format") != fmt:
+        previous = {"partitions": {}}
+    elif [s["sha256"] for s in sources] == [s.get("sha256") for s in previous.get("sources", [])]:
+        # Same content under a new name or mtime: nothing to ingest.
+        manifest = dict(previous, sources=sources)
+        write_manifest(store_dir, manifest)
+        return manifest
+
+    snapshot = f"snapshot-{time.time_ns():x}"
+    snapshot_dir = store_dir / snapshot
+    snapshot_dir.mkdir()
+
+    raw = pd.concat([read_export(path, with_country=True) for path in csv_paths], ignore_index=True)
+    raw["refArea"] = raw["refArea"].astype("category")
+    raw["Indicator Code"] = raw["Indicator Code"].astype("category")
+
+    partitions = {}
+    for ref_area, part in raw.groupby("refArea", observed=True, sort=True):
+        country = country_name(ref_area)
+        part = (
+            part.drop(columns="refArea")
+            .sort_values(["Indicator Code", "refPeriod"], kind="stable")
+            .drop_duplicates(["Indicator Code", "refPeriod"], keep="last")
+        )
+        part["Indicator Code"] = part["Indicator Code"].cat.remove_unused_categories()
+        frame = process_export(part)
+        version = partition_version(frame)
+        path = snapshot_dir / partition_file(country, fmt)
+        old = previous["partitions"].get(country)
+
+        if old is not None and old.get("version") == version:
+            link_partition(store_dir / previous["snapshot"] / old["file"], path)
+            partitions[country] = dict(old, file=path.name)
+            partitions[country].pop("changes", None)
+            continue
+
+        write_partition(frame, path, fmt)
+        partitions[country] = {"file": path.name, "rows": len(frame), "version": version}
+        if old is not None:
+            old_frame = read_partition(store_dir / previous["snapshot"] / old["file"], fmt)
+            changed = changed_observations(old_frame, frame)
+            partitions[country]["changes"] = {
+                "base_version": old.get("version"),
+                "indicators": sorted(changed["Indicator Code"].unique().tolist()),
+                "years": sorted(int(year) for year in changed["refPeriod"].unique()),
+            }
+
+    manifest = {
+        "sources": sources,
+        "snapshot": snapshot,
+        "format": fmt,
+        "partitions": partitions,
+    }
+    write_manifest(store_dir, manifest)
+    prune_snapshots(store_dir, snapshot)
+    return manifest
+
+
+def ensure_store(csv_paths, store_dir, fmt="parquet"):
+    """Build the store unless its manifest already matches ``csv_paths`` and ``fmt``."""
+    def is_current(manifest):
+        return (
+            manifest is not None
+            and manifest.get("format") == fmt
+            and _stat_key(manifest.get("sources", [])) == _stat_key(source_signature(csv_paths))
+        )
+
+    manifest = read_manifest(store_dir)
+    if is_current(manifest):
+        return manifest
+    Path(store_dir).mkdir(parents=True, exist_ok=True)
+    with build_lock(store_dir):
+        # Another worker may have finished the build while we waited.
+        manifest = read_manifest(store_dir)
+        if is_current(manifest):
+            return manifest
+        return build_store(csv_paths, store_dir, fmt)
+
+
+class PartitionStore:
+    def __init__(self, store_dir, indicator_names, memory_budget_mb=DEFAULT_MEMORY_BUDGET_MB):
+        self.store_dir = Path(store_dir)
+        self.indicator_names = indicator_names
+        self.memory_budget = int(memory_budget_mb * 1024 * 1024)
+        self.loads = 0
+        self.evictions = 0
+        self._snapshot = None
+        self._manifest_mtime = None
+        self._format = "parquet"
+        self._partitions = {}
+        self._loaded = OrderedDict()
+        self._sizes = {}
+        self._lock = threading.Lock()
+        self.refresh()
+
+    @property
+    def snapshot(self):
+        return self._snapshot
+
+    def refresh_if_changed(self):
+        """Pick up a newly published snapshot; cheap enough to call every rerun."""
+        try:
+            mtime = (self.store_dir / MANIFEST_NAME).stat().st_mtime_ns
+        except OSError:
+            return False
+        if mtime == self._manifest_mtime:
+            return False
+        self.refresh()
+        return True
+
+    def refresh(self):
+        """Re-read the manifest; drop loaded partitions whose version changed."""
+        try:
+            self._manifest_mtime = (self.store_dir / MANIFEST_NAME).stat().st_mtime_ns
+        except OSError:
+            self._manifest_mtime = None
+        manifest = read_manifest(self.store_dir) or {"partitions": {}}
+        partitions = manifest["partitions"]
+        with self._lock:
+            for country in list(self._loaded):
+                old = self._partitions.get(country, {})
+                new = partitions.get(country, {})
+                if new.get("version") is None or new.get("version") != old.get("version"):
+                    del self._loaded[country]
+                    del self._sizes[country]
+            self._snapshot = manifest.get("snapshot")
+            self._format = manifest.get("format", "parquet")
+            self._partitions = partitions
+
+    def countries(self):
+        return sorted(self._partitions)
+
+    def version(self, country):
+        """Return the content version of ``country``'s partition."""
+        return self._partitions.get(country, {}).get("version")
+
+    def changes(self, country):
+        """Return the observations that changed in the last build, if recorded.
+
+        The record holds ``base_version`` (the version it was diffed
+        against), indicator codes and years.
+        """
+        return self._partitions.get(country, {}).get("changes")
+
+    def resident_bytes(self):
+        with self._lock:
+            return sum(self._sizes.values())
+
+    def get(self, country):
+        """Return the processed frame for ``country``, loading it on first use."""
+        with self._lock:
+            if country in self._loaded:
+                self._loaded.move_to_end(country)
+                return self._loaded[country]
+            entry = self._partitions.get(country)
+            snapshot, fmt = self._snapshot, self._format
+        if entry is None:
+            raise KeyError(f"No partition for {country!r} in {self.store_dir}")
+
+        path = self.store_dir / snapshot / entry["file"]
+        df = attach_names(read_partition(path, fmt), self.indicator_names)
+
+        with self._lock:
+            if snapshot == self._snapshot:
+                self.loads += 1
+                self._loaded[country] = df
+                self._sizes[country] = int(df.memory_usage(deep=True).sum())
+                self._evict()
+        return df
+
+    def _evict(self):
+        # Always keep the partition that was just requested.
+        while len(self._loaded) > 1 and sum(self._sizes.values()) > self.memory_budget:
+            country, _ = self._loaded.popitem(last=False)
+            del self._sizes[country]
+            self.evictions += 1
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Build and publish a partitioned snapshot of IDS exports.")
+    parser.add_argument("csv_paths", nargs="+", help="IDS export CSV files")
+    parser.add_argument("--store-dir", default="store")
+    parser.add_argument("--format", choices=sorted(FORMATS), default="parquet")
+    args = parser.parse_args(argv)
+    Path(args.store_dir).mkdir(parents=True, exist_ok=True)
+    with build_lock(args.store_dir):
+        previous = read_manifest(args.store_dir) or {}
+        manifest = build_store(args.csv_paths, args.store_dir, args.format)
+    if manifest["snapshot"] == previous.get("snapshot"):
+        print(f"Store already up to date ({manifest['snapshot']})")
+        return
+    changed = sorted(country for country, entry in manifest["partitions"].items() if "changes" in entry)
+    print(f"Published {manifest['snapshot']} with {len(manifest['partitions'])} partitions"
+          f" ({len(changed)} changed)")
+
+
+if __name__ == "__main__":
+    main()